@@ -1,88 +1,490 @@
-from flask import Flask, render_template, jsonify
-import pandas as pd
-import yfinance as yf
+from flask import Flask, Response, render_template, jsonify, request
+import hashlib
 import os
-from datetime import datetime, timedelta
+import sys
+import threading
+from collections import OrderedDict
+from functools import partial
 import json
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+
+# pandas, yfinance and the forecasting modules are imported where they are
+# first needed, so a cold start serving the precomputed snapshot only loads
+# Flask and NumPy
+from batching import RequestCoalescer
+from downsample import lttb_indices
+from fx_rates import CURRENCIES, asof_rates, check_currency, latest_rate, yahoo_fx_source
+from metrics import record_cache, registry, timer
+from model_registry import load_model
+from price_cache import PriceCache
+from price_stats import StatsIndex
+
 app = Flask(__name__)
 
 # Constants
 TROY_OUNCE_TO_GRAM = 31.1035
 GOLD_WEIGHT = 8
-USD_TO_INR = 83.5
+TOLA_TO_GRAM = 11.6638
+
+# Units accepted by /api/gold-price, in grams
+UNIT_GRAMS = {"g": 1.0, "oz": TROY_OUNCE_TO_GRAM, "tola": TOLA_TO_GRAM}
+
+# Largest weight /api/gold-price prices (one tonne), so every price stays finite
+MAX_WEIGHT_GRAMS = 1_000_000
+
+# Distinct /api/gold-price projections kept as pre-encoded responses
+MAX_CACHED_RESPONSES = 64
+
+# Seconds before the cached prices are refreshed from Yahoo Finance
+CACHE_TTL = int(os.environ.get("GOLD_CACHE_TTL", 900))
+
+# Refresh prices in a background thread and serve the last good data meanwhile
+BACKGROUND_REFRESH = os.environ.get("GOLD_BACKGROUND_REFRESH", "1") != "0"
+
+# Seconds before an upstream download is given up on
+FETCH_TIMEOUT = float(os.environ.get("GOLD_FETCH_TIMEOUT", 20))
+
+# Seconds clients may reuse a response before revalidating it with its ETag
+RESPONSE_MAX_AGE = int(os.environ.get("GOLD_RESPONSE_MAX_AGE", 60))
+
+# Precomputed default /api/gold-price response, served on a cold start until live prices load
+SNAPSHOT_PATH = os.path.join(ROOT_DIR, "data", "gold_price_snapshot.json")
+DEFAULT_PROJECTION = (GOLD_WEIGHT, "g", "INR")
+
+MODEL_PATH = os.path.join(ROOT_DIR, "model", "model.pkl")
+PARAMS_PATH = os.path.join(ROOT_DIR, "model", "model.json")
 
-def fetch_gold_data():
+# Points returned by /api/gold-price/history
+DEFAULT_HISTORY_POINTS = 500
+MAX_HISTORY_POINTS = 5000
+
+# Limits for /api/predict requests; every price is forecast to the longest
+# horizon, so prices times horizon is capped too (about 20 MB of JSON)
+MAX_PREDICT_ITEMS = 4096
+MAX_PREDICT_HORIZON = 365
+MAX_PREDICT_VALUES = 1_000_000
+
+# Prices per /api/predict request that may ask for simulated prediction intervals,
+# and simulated days summed over them (365 days of 10,000 paths take about 0.25 s)
+MAX_INTERVAL_ITEMS = 10
+MAX_INTERVAL_DAYS = 365
+
+# Seconds a single-price prediction waits for others to batch with
+PREDICT_BATCH_WINDOW = float(os.environ.get("GOLD_PREDICT_BATCH_WINDOW", 0.002))
+
+def fetch_gold_data(start="2010-01-01"):
     """Fetch gold price data from Yahoo Finance"""
     try:
-        data = yf.download("GC=F", start="2010-01-01")
-        data = data[["Close"]].dropna()
+        import yfinance as yf
+
+        with timer("fetch"):
+            data = yf.download("GC=F", start=start, timeout=FETCH_TIMEOUT)
+        with timer("parse"):
+            data = data[["Close"]].dropna()
         return data
     except Exception as e:
         print(f"Error fetching data: {e}")
         return None
 
+def fetch_fx_data(currency, start="2010-01-01"):
+    """Fetch daily USD to ``currency`` rates from Yahoo Finance"""
+    try:
+        with timer("fetch"):
+            return yahoo_fx_source(currency, start=start, timeout=FETCH_TIMEOUT)
+    except Exception as e:
+        print(f"Error fetching {currency} rates: {e}")
+        return None
+
+price_cache = PriceCache(fetch_gold_data, ttl=CACHE_TTL, background=BACKGROUND_REFRESH, timeout=FETCH_TIMEOUT)
+
+# USD to currency rates, refreshed like the prices; loaded on first use
+fx_caches = {
+    currency: PriceCache(partial(fetch_fx_data, currency), ttl=CACHE_TTL, background=BACKGROUND_REFRESH,
+                         timeout=FETCH_TIMEOUT, name=f"fx_{currency.lower()}")
+    for currency in CURRENCIES if currency != "USD"
+}
+
+def get_fx(currency):
+    """Cached rates for ``currency``, or None (meaning fallback rates) until they have loaded"""
+    cache = fx_caches.get(currency)
+    return None if cache is None else cache.get(wait=False)
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/api/gold-price')
-def gold_price():
-    # Fetch gold data
-    df = fetch_gold_data()
-    
-    if df is None:
-        return jsonify({"error": "Failed to fetch gold data"}), 500
-    
-    # Calculate 8g gold price
-    df["Close_INR"] = df["Close"] * USD_TO_INR
-    df["8g_Gold_USD"] = df["Close"] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
-    df["8g_Gold_INR"] = df["Close_INR"] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
+# Per currency: (frame, rates, prices per troy ounce, StatsIndex) for the latest data
+_ounce_series = {}
+_ounce_series_lock = threading.Lock()
+
+def get_ounce_series(df, fx, currency):
+    """Prices per troy ounce in ``currency`` and a StatsIndex over them, converted once per data version"""
+    entry = _ounce_series.get(currency)
+    if entry is not None and entry[0] is df and entry[1] is fx:
+        return entry[2], entry[3]
+
+    with _ounce_series_lock:
+        entry = _ounce_series.get(currency)
+        if entry is None or entry[0] is not df or entry[1] is not fx:
+            with timer("transform"):
+                close = df["Close"].to_numpy(dtype=float).ravel()
+                prices = close if currency == "USD" else close * asof_rates(fx, df.index, currency)
+            # Synced rather than rebuilt, so appended rows only extend it; sync
+            # returns a new index, so readers of the old entry are unaffected
+            with timer("stats"):
+                stats = (entry[3] if entry is not None else StatsIndex()).sync(prices)
+            entry = (df, fx, prices, stats)
+            _ounce_series[currency] = entry
+        return entry[2], entry[3]
+
+def build_gold_price_payload(df, fx=None, currency="INR", weight=GOLD_WEIGHT, unit="g"):
+    """Build the /api/gold-price response body for ``weight`` ``unit`` of gold in ``currency``.
+
+    Prices come from the cached troy-ounce series with one scalar multiply,
+    only for the rows in the response; statistics are read from a StatsIndex
+    over the ounce series and scaled the same way. ``fx`` holds the USD to
+    ``currency`` rates applied to each date (fallback rates if None).
+    """
+    from gold_data import trailing_slice
+
+    factor = weight * UNIT_GRAMS[unit] / TROY_OUNCE_TO_GRAM
+    ounce_usd, _ = get_ounce_series(df, None, "USD")
+    ounce, stats = get_ounce_series(df, fx, currency)
+    price_key = f"price_{currency.lower()}"
     
     # Get current price
     current_date = df.index.max().strftime("%Y-%m-%d")
-    current_8g_price_usd = float(df["8g_Gold_USD"].iloc[-1])
-    current_8g_price_inr = float(df["8g_Gold_INR"].iloc[-1])
     
     # Get historical data (last 30 days)
-    last_30_days = df.iloc[-30:].copy()
-    historical_data = []
-    
-    for date, row in last_30_days.iterrows():
-        historical_data.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "price_usd": float(row["8g_Gold_USD"]),
-            "price_inr": float(row["8g_Gold_INR"])
-        })
+    historical_data = [
+        {"date": date, "price_usd": usd, price_key: price}
+        for date, usd, price in zip(
+            df.index[-30:].strftime("%Y-%m-%d"),
+            (ounce_usd[-30:] * factor).tolist(),
+            (ounce[-30:] * factor).tolist(),
+        )
+    ]
     
     # Calculate statistics
-    last_year = df[df.index >= (df.index.max() - timedelta(days=365))]
-    avg_price = float(last_year["8g_Gold_INR"].mean())
-    min_price = float(last_year["8g_Gold_INR"].min())
-    max_price = float(last_year["8g_Gold_INR"].max())
+    last_year = trailing_slice(df.index, 365)
     
     # Calculate price change over the last month
-    last_month = df[df.index >= (df.index.max() - timedelta(days=30))]
+    last_month = ounce[trailing_slice(df.index, 30)]
     if len(last_month) > 1:
-        change = last_month["8g_Gold_INR"].iloc[-1] - last_month["8g_Gold_INR"].iloc[0]
-        change_percent = (change / last_month["8g_Gold_INR"].iloc[0]) * 100
+        change = float(last_month[-1] - last_month[0]) * factor
+        change_percent = float(last_month[-1] / last_month[0] - 1) * 100
     else:
         change = 0
         change_percent = 0
     
-    return jsonify({
+    return {
         "current_date": current_date,
-        "current_price_usd": current_8g_price_usd,
-        "current_price_inr": current_8g_price_inr,
+        "weight": weight,
+        "unit": unit,
+        "currency": currency,
+        "current_price_usd": float(ounce_usd[-1]) * factor,
+        f"current_{price_key}": float(ounce[-1]) * factor,
         "historical_data": historical_data,
         "statistics": {
-            "average": avg_price,
-            "minimum": min_price,
-            "maximum": max_price,
+            "average": stats.mean(last_year) * factor,
+            "minimum": stats.min(last_year) * factor,
+            "maximum": stats.max(last_year) * factor,
             "monthly_change": change,
             "monthly_change_percent": change_percent
         }
-    })
+    }
+
+class ResponseSnapshot:
+    """Pre-encoded JSON body and strong ETag for one version of the data"""
+
+    def __init__(self, key, payload):
+        self.key = key
+        with timer("serialize"):
+            self.body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()
+
+    @classmethod
+    def from_body(cls, key, body):
+        """Snapshot for an already encoded body"""
+        snapshot = cls.__new__(cls)
+        snapshot.key = key
+        snapshot.body = body
+        snapshot.etag = hashlib.sha256(body).hexdigest()
+        return snapshot
+
+def write_snapshot_artifact(df, fx=None, path=SNAPSHOT_PATH):
+    """Write the default projection of ``df`` to ``path`` for cold starts; returns the snapshot"""
+    weight, unit, currency = DEFAULT_PROJECTION
+    snapshot = ResponseSnapshot(None, build_gold_price_payload(df, fx, currency, weight, unit))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(snapshot.body)
+    os.replace(tmp_path, path)
+    return snapshot
+
+_artifact = {"loaded": False, "snapshot": None}
+_artifact_lock = threading.Lock()
+
+def get_snapshot_artifact():
+    """The precomputed default response, read once per worker (None when there is no artifact)"""
+    if not _artifact["loaded"]:
+        with _artifact_lock:
+            if not _artifact["loaded"]:
+                try:
+                    with open(SNAPSHOT_PATH, "rb") as f:
+                        _artifact["snapshot"] = ResponseSnapshot.from_body(None, f.read())
+                except OSError:
+                    pass
+                _artifact["loaded"] = True
+    return _artifact["snapshot"]
+
+# Snapshots per (weight, unit, currency), least recently used evicted first
+_snapshots = OrderedDict()
+_snapshot_lock = threading.Lock()
+
+def get_gold_price_snapshot(weight=GOLD_WEIGHT, unit="g", currency="INR"):
+    """Return the snapshot for one projection of the cached data, rebuilding it only when the data changes.
+
+    Until the first download has finished, the default projection is served
+    from the precomputed artifact, so a cold worker answers without pandas.
+    """
+    params = (weight, unit, currency)
+    artifact = get_snapshot_artifact() if params == DEFAULT_PROJECTION else None
+    df = price_cache.get(wait=artifact is None)
+    if df is None:
+        return artifact
+    fx = None if currency == "USD" else get_fx(currency)
+    
+    # The caches swap in new frames whenever rows are appended
+    with _snapshot_lock:
+        snapshot = _snapshots.get(params)
+        if snapshot is not None:
+            _snapshots.move_to_end(params)
+    fresh = snapshot is not None and snapshot.key[0] is df and snapshot.key[1] is fx
+    record_cache("response", fresh)
+    if not fresh:
+        snapshot = ResponseSnapshot((df, fx), build_gold_price_payload(df, fx, currency, weight, unit))
+        with _snapshot_lock:
+            _snapshots[params] = snapshot
+            _snapshots.move_to_end(params)
+            while len(_snapshots) > MAX_CACHED_RESPONSES:
+                _snapshots.popitem(last=False)
+    return snapshot
+
+def parse_projection(args):
+    """Read ``weight``, ``unit`` and ``currency`` query parameters, defaulting to 8g in INR"""
+    try:
+        weight = float(args.get("weight", GOLD_WEIGHT))
+    except ValueError:
+        weight = float("nan")
+    if not (np.isfinite(weight) and weight > 0):
+        raise ValueError("weight must be a positive number")
+    unit = args.get("unit", "g").lower()
+    currency = check_currency(args.get("currency", "INR"))
+    if unit not in UNIT_GRAMS:
+        raise ValueError(f"unit must be one of {', '.join(UNIT_GRAMS)}")
+    if weight * UNIT_GRAMS[unit] > MAX_WEIGHT_GRAMS:
+        raise ValueError(f"weight must be at most {MAX_WEIGHT_GRAMS:,} g")
+    # 8 and 8.0 share a cache entry
+    return (int(weight) if weight.is_integer() else weight), unit, currency
+
+@app.route('/api/gold-price')
+def gold_price():
+    """Current price and statistics, for ``weight`` ``unit`` (g, oz or tola) of gold in ``currency``"""
+    try:
+        weight, unit, currency = parse_projection(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    snapshot = get_gold_price_snapshot(weight, unit, currency)
+    
+    if snapshot is None:
+        return jsonify({"error": "Failed to fetch gold data"}), 500
+    
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.body, mimetype="application/json")
+    response.set_etag(snapshot.etag)
+    response.headers["Cache-Control"] = f"public, max-age={RESPONSE_MAX_AGE}, must-revalidate"
+    return response
+
+@app.route('/api/gold-price/history')
+def gold_price_history():
+    """8g price history between ``from`` and ``to``, downsampled to ``points`` with LTTB"""
+    import pandas as pd
+    from gold_data import date_slice
+
+    df = price_cache.get()
+    
+    if df is None:
+        return jsonify({"error": "Failed to fetch gold data"}), 500
+    
+    try:
+        start = pd.Timestamp(request.args["from"]) if request.args.get("from") else None
+        end = pd.Timestamp(request.args["to"]) if request.args.get("to") else None
+        points = int(request.args.get("points", DEFAULT_HISTORY_POINTS))
+    except ValueError:
+        return jsonify({"error": "from/to must be dates (YYYY-MM-DD) and points an integer"}), 400
+    if not 3 <= points <= MAX_HISTORY_POINTS:
+        return jsonify({"error": f"points must be between 3 and {MAX_HISTORY_POINTS}"}), 400
+    
+    with timer("transform"):
+        window = df.iloc[date_slice(df.index, start, end)]
+        close = window["Close"].to_numpy(dtype=float).ravel()
+        keep = lttb_indices(window.index.asi8, close, points)
+        gold_8g_usd = close[keep] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
+        gold_8g_inr = gold_8g_usd * asof_rates(get_fx("INR"), window.index[keep], "INR")
+    
+    with timer("serialize"):
+        response = jsonify({
+            "from": window.index[0].strftime("%Y-%m-%d") if len(window) else None,
+            "to": window.index[-1].strftime("%Y-%m-%d") if len(window) else None,
+            "points": len(keep),
+            "dates": window.index[keep].strftime("%Y-%m-%d").tolist(),
+            "price_usd": gold_8g_usd.tolist(),
+            "price_inr": gold_8g_inr.tolist()
+        })
+    response.add_etag()
+    response.headers["Cache-Control"] = f"public, max-age={RESPONSE_MAX_AGE}, must-revalidate"
+    return response.make_conditional(request)
+
+def get_model():
+    """Return the model, loaded once per worker and reloaded only when the file changes"""
+    return load_model(MODEL_PATH, PARAMS_PATH)
+
+@timer("predict")
+def predict_usd(prices, horizon):
+    """Forecast from USD prices, feeding lag-feature models the cached price history"""
+    from features import pipeline_for
+    from forecast import forecast_paths
+
+    model = get_model()
+    history = start_date = None
+    if not pipeline_for(model).is_legacy:
+        df = price_cache.get()
+        if df is None:
+            raise RuntimeError("Price history is unavailable")
+        history = df["Close"].to_numpy(dtype=float).ravel()[:-1]
+        start_date = df.index[-1]
+    return forecast_paths(model, prices, horizon, history, start_date)
+
+predict_coalescer = RequestCoalescer(predict_usd, window=PREDICT_BATCH_WINDOW)
+
+# Residuals of the current model on the cached history, rebuilt when either changes
+_residuals = {"model": None, "data": None, "values": None}
+_residuals_lock = threading.Lock()
+
+# One flat simulation buffer per worker thread, grown to the longest horizon it has served
+_path_buffers = threading.local()
+
+def get_residuals(model, df):
+    from forecast import training_residuals
+
+    with _residuals_lock:
+        if _residuals["model"] is not model or _residuals["data"] is not df:
+            closes = df["Close"].to_numpy(dtype=float).ravel()
+            _residuals.update(model=model, data=df, values=training_residuals(model, closes, df.index.to_numpy()))
+        return _residuals["values"]
+
+@timer("simulate")
+def intervals_usd(prices, horizons):
+    """Quantile bands for each USD price from simulated paths, one ``(quantiles, horizon)`` array each"""
+    from forecast import SIMULATED_PATHS, forecast_intervals
+
+    model = get_model()
+    df = price_cache.get()
+    if df is None:
+        raise RuntimeError("Price history is unavailable")
+    residuals = get_residuals(model, df)
+    history = df["Close"].to_numpy(dtype=float).ravel()[:-1]
+
+    size = SIMULATED_PATHS * int(max(horizons))
+    buffer = getattr(_path_buffers, "paths", None)
+    if buffer is None or len(buffer) < size:
+        buffer = _path_buffers.paths = np.empty(size)
+    return [
+        forecast_intervals(model, price, int(h), residuals, history=history, start_date=df.index[-1],
+                           out=buffer[:SIMULATED_PATHS * int(h)].reshape(SIMULATED_PATHS, int(h)))
+        for price, h in zip(prices, horizons)
+    ]
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """Forecast prices for a batch of current prices.
+
+    Accepts ``{"prices": [...], "currency": "usd" | "inr", "horizon": n}``
+    where USD prices are per troy ounce and INR prices are for 8g. The
+    horizon may also be a list with one entry per price. Predictions are
+    returned in the same unit as the inputs. With ``"intervals": true``
+    the response also has 5/50/95% bands per price from simulated paths.
+    """
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "request body must be a JSON object"}), 400
+    currency = str(body.get("currency", "usd")).lower()
+    if currency not in ("usd", "inr"):
+        return jsonify({"error": "currency must be 'usd' or 'inr'"}), 400
+    
+    try:
+        prices = np.asarray(body.get("prices"), dtype=np.float64)
+        horizons = np.asarray(body.get("horizon", 1), dtype=np.float64)
+        # Nested lists are not flattened and 1.7 days is not rounded
+        if prices.ndim != 1 or horizons.ndim > 1 or not np.all(horizons == np.trunc(horizons)):
+            raise ValueError("prices must be flat and horizons whole numbers")
+        horizons = np.broadcast_to(horizons, prices.shape)
+    except (TypeError, ValueError):
+        return jsonify({"error": "prices must be a list of numbers and horizon an integer or list of integers"}), 400
+    if not 0 < len(prices) <= MAX_PREDICT_ITEMS or not np.isfinite(prices).all():
+        return jsonify({"error": f"prices must contain 1 to {MAX_PREDICT_ITEMS} finite numbers"}), 400
+    if not (horizons.min() >= 1 and horizons.max() <= MAX_PREDICT_HORIZON):
+        return jsonify({"error": f"horizon must be between 1 and {MAX_PREDICT_HORIZON}"}), 400
+    horizons = horizons.astype(np.int64)
+    if len(prices) * horizons.max() > MAX_PREDICT_VALUES:
+        return jsonify({"error": f"at most {MAX_PREDICT_VALUES:,} predictions per request (prices times horizon)"}), 400
+    with_intervals = body.get("intervals", False)
+    if not isinstance(with_intervals, bool):
+        return jsonify({"error": "intervals must be true or false"}), 400
+    if with_intervals and len(prices) > MAX_INTERVAL_ITEMS:
+        return jsonify({"error": f"intervals are available for at most {MAX_INTERVAL_ITEMS} prices"}), 400
+    if with_intervals and horizons.sum() > MAX_INTERVAL_DAYS:
+        return jsonify({"error": f"intervals are available for at most {MAX_INTERVAL_DAYS} days in total "
+                                 "(prices times horizon)"}), 400
+    
+    # The model works in USD per troy ounce
+    to_usd = 1.0 if currency == "usd" else 1.0 / (latest_rate(get_fx("INR"), "INR") * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM))
+    prices_usd = prices * to_usd
+    
+    try:
+        if len(prices_usd) == 1:
+            paths = [predict_coalescer.submit(prices_usd[0], horizons[0])]
+        else:
+            paths = predict_usd(prices_usd, int(horizons.max()))
+        bands = intervals_usd(prices_usd, horizons) if with_intervals else None
+    except Exception as e:
+        print(f"Error predicting: {e}")
+        return jsonify({"error": "Prediction failed"}), 500
+    
+    result = {"currency": currency, "predictions": [(row[:h] / to_usd).tolist() for row, h in zip(paths, horizons)]}
+    if bands is not None:
+        from forecast import INTERVAL_QUANTILES
+
+        result["intervals"] = [
+            {f"p{q:g}": (band / to_usd).tolist() for q, band in zip(INTERVAL_QUANTILES, price_bands)}
+            for price_bands in bands
+        ]
+    return jsonify(result)
+
+@app.route('/metrics')
+def metrics():
+    """Stage timings and cache hit/miss counts in the Prometheus text format"""
+    return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -1,14 +1,17 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pickle
 import os
-import numpy as np
 from datetime import datetime, timedelta
 
-# USD to INR conversion rate (approximate)
-USD_TO_INR = 83.5
+# seaborn, matplotlib and the forecasting code load on first use, so the
+# first page render only waits on the price data
+from chart_cache import chart_cache
+from downsample import downsample_frame
+from fx_rates import latest_rate, load_fx
+from gold_data import GOLD_WEIGHT, TROY_OUNCE_TO_GRAM, date_slice, frame_version, get_gold_data, get_stats_index
+from metrics import registry, timer
+from model_registry import load_model
+from price_store import has_prices
 
 # Page configuration
 st.set_page_config(page_title="Gold Price Predictor", page_icon="🟡", layout="wide")
@@ -52,7 +55,7 @@ st.markdown('<div class="title">🟡 8g Gold Price Predictor</div>', unsafe_allo
 st.markdown('<div class="subtitle">Forecast tomorrow\'s 8g gold prices with machine learning</div>', unsafe_allow_html=True)
 
 # Check if data and model exist, if not, create them
-if not os.path.exists("data/gold_data.csv"):
+if not has_prices():
     st.warning("No data found. Fetching gold price data...")
     try:
         from data_loader import fetch_data
@@ -72,48 +75,17 @@ if not os.path.exists("model/model.pkl"):
         st.error(f"Error training model: {e}")
         st.stop()
 
-# Load model
+# Load model (cached per process, without sklearn for linear models)
 try:
-    with open("model/model.pkl", "rb") as f:
-        model = pickle.load(f)
+    model = load_model()
 except Exception as e:
     st.error(f"Error loading model: {e}")
     st.stop()
 
 # Load data
 try:
-    df = pd.read_csv("data/gold_data.csv")
-    
-    # Handle the unusual CSV format
-    if "Price" in df.columns and "Close" in df.columns:
-        # Use the Close column and create a proper Date column
-        df = df.rename(columns={"Unnamed: 0": "Date"})
-        if "Date" not in df.columns:
-            # Create a date index if missing
-            df["Date"] = pd.date_range(end=datetime.now(), periods=len(df), freq='B')
-    elif "Date" not in df.columns and len(df.columns) >= 2:
-        # Try to fix by assuming first column is date
-        df = pd.read_csv("data/gold_data.csv", skiprows=3)
-        if len(df.columns) >= 2:
-            df.columns = ["Date", "Close"] + [f"Col{i}" for i in range(len(df.columns)-2)]
-    
-    # Ensure Date is datetime
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-        df.set_index("Date", inplace=True)
-    
-    # Ensure we have the Close column
-    if "Close" not in df.columns:
-        st.error(f"Close column not found in data. Available columns: {df.columns.tolist()}")
-        st.stop()
-    
-    # Ensure Close column is numeric
-    df["Close"] = pd.to_numeric(df["Close"], errors='coerce')
-    df.dropna(subset=["Close"], inplace=True)
-    
-    # Convert USD to INR
-    df["Close_INR"] = df["Close"] * USD_TO_INR
-        
+    # Shared, read-only frame with the INR and 8g columns already computed
+    df = get_gold_data()
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
@@ -135,34 +107,35 @@ with col1:
     )
     
     # Filter data based on selected date range
-    mask = (df.index.date >= date_range[0]) & (df.index.date <= date_range[1])
-    filtered_df = df.loc[mask]
+    range_slice = date_slice(df.index, date_range[0], date_range[1])
+    filtered_df = df.iloc[range_slice]
     
-    # Calculate 8g gold price
-    TROY_OUNCE_TO_GRAM = 31.1035
-    GOLD_WEIGHT = 8
-    filtered_df["8g_Gold_INR"] = filtered_df["Close_INR"] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
+    # Plot at most one point per pixel, keeping the peaks and troughs
+    def draw_history(ax):
+        import seaborn as sns
+
+        plot_df = downsample_frame(filtered_df, "8g_Gold_INR")
+        sns.lineplot(data=plot_df, x=plot_df.index, y="8g_Gold_INR", ax=ax, color="#FFD700", linewidth=2.5)
+        ax.set_title("8g Gold Price Trend (INR)", fontsize=16)
+        ax.set_ylabel("Price (INR)")
+        ax.set_xlabel("Date")
+        ax.grid(True, alpha=0.3)
     
-    # Plot
-    fig, ax = plt.subplots(figsize=(10, 5))
-    sns.lineplot(data=filtered_df, x=filtered_df.index, y="8g_Gold_INR", ax=ax, color="#FFD700", linewidth=2.5)
-    ax.set_title("8g Gold Price Trend (INR)", fontsize=16)
-    ax.set_ylabel("Price (INR)")
-    ax.set_xlabel("Date")
-    ax.grid(True, alpha=0.3)
-    st.pyplot(fig)
+    # Rendered once per data version and date range
+    st.image(chart_cache.get_or_render((frame_version(), tuple(date_range), "app_history"), draw_history))
     
     # Statistics
     st.subheader("📈 8g Gold Price Statistics")
+    stats = get_stats_index("8g_Gold_INR")
     stats_cols = st.columns(4)
     with stats_cols[0]:
         st.metric("Current", f"₹{float(filtered_df['8g_Gold_INR'].iloc[-1]):.2f}")
     with stats_cols[1]:
-        st.metric("Average", f"₹{float(filtered_df['8g_Gold_INR'].mean()):.2f}")
+        st.metric("Average", f"₹{stats.mean(range_slice):.2f}")
     with stats_cols[2]:
-        st.metric("Minimum", f"₹{float(filtered_df['8g_Gold_INR'].min()):.2f}")
+        st.metric("Minimum", f"₹{stats.min(range_slice):.2f}")
     with stats_cols[3]:
-        st.metric("Maximum", f"₹{float(filtered_df['8g_Gold_INR'].max()):.2f}")
+        st.metric("Maximum", f"₹{stats.max(range_slice):.2f}")
 
 with col2:
     st.markdown('<div class="prediction-box">', unsafe_allow_html=True)
@@ -172,13 +145,14 @@ with col2:
     input_method = st.radio("Select input method:", ["Use latest price", "Enter manually"])
     
     # Calculate 8g gold price conversion factor
-    TROY_OUNCE_TO_GRAM = 31.1035
-    GOLD_WEIGHT = 8
     conversion_factor = GOLD_WEIGHT / TROY_OUNCE_TO_GRAM
     
+    # Latest stored USD/INR rate, also used for the forecast days
+    usd_to_inr = latest_rate(load_fx("INR"), "INR")
+    
     if input_method == "Use latest price":
         current_price_usd = float(df["Close"].iloc[-1])
-        current_price_inr = current_price_usd * USD_TO_INR
+        current_price_inr = current_price_usd * usd_to_inr
         current_8g_price_inr = current_price_inr * conversion_factor
         st.info(f"Latest 8g gold price: ₹{current_8g_price_inr:.2f} INR")
     else:
@@ -190,12 +164,19 @@ with col2:
             format="%.2f"
         )
         current_price_inr = current_8g_price_inr / conversion_factor
-        current_price_usd = current_price_inr / USD_TO_INR
+        current_price_usd = current_price_inr / usd_to_inr
+    
+    # Closes before the current price, for models trained on lagged features
+    history_usd = df["Close"].to_numpy()[:-1]
+    latest_date = df.index[-1]
     
     # Prediction
     if st.button("Predict Next Day's Price", use_container_width=True):
-        prediction_usd = model.predict([[current_price_usd]])[0]
-        prediction_inr = prediction_usd * USD_TO_INR
+        from forecast import forecast_paths
+
+        with timer("predict"):
+            prediction_usd = forecast_paths(model, current_price_usd, 1, history_usd, latest_date)[0, 0]
+        prediction_inr = prediction_usd * usd_to_inr
         change = prediction_inr - current_price_inr
         change_percent = (change / current_price_inr) * 100
         
@@ -217,38 +198,58 @@ with col2:
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Multi-day forecast
-    st.subheader("🔮 5-Day Forecast")
+    st.subheader("🔮 Multi-Day Forecast")
+    forecast_days = st.slider("Forecast horizon (days)", min_value=1, max_value=30, value=5)
     if st.button("Generate Forecast", use_container_width=True):
-        # Generate 5-day forecast
-        forecasts_usd = []
-        next_price_usd = current_price_usd
+        from forecast import forecast_intervals, forecast_paths, training_residuals
+
+        # Generate the whole forecast in one vectorized pass
+        with timer("predict"):
+            forecasts_usd = forecast_paths(model, current_price_usd, forecast_days, history_usd, latest_date)[0]
         
-        for i in range(5):
-            next_price_usd = model.predict([[next_price_usd]])[0]
-            forecasts_usd.append(next_price_usd)
+        # 5/50/95% bands from 10,000 paths with bootstrapped model errors
+        with timer("simulate"):
+            residuals = training_residuals(model, df["Close"].to_numpy(), df.index.to_numpy())
+            bands_usd = forecast_intervals(model, current_price_usd, forecast_days, residuals,
+                                           history=history_usd, start_date=latest_date)
         
         # Convert to INR and then to 8g gold price
-        forecasts_inr = [price * USD_TO_INR for price in forecasts_usd]
-        forecasts_8g_inr = [price * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM) for price in forecasts_inr]
+        to_8g_inr = usd_to_inr * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
+        forecasts_8g_inr = forecasts_usd * to_8g_inr
+        low_8g_inr, median_8g_inr, high_8g_inr = bands_usd * to_8g_inr
         
         # Create forecast dataframe
-        forecast_dates = [datetime.now().date() + timedelta(days=i+1) for i in range(5)]
+        forecast_dates = [datetime.now().date() + timedelta(days=i+1) for i in range(forecast_days)]
         forecast_df = pd.DataFrame({
             'Date': forecast_dates,
-            'Predicted 8g Gold Price (INR)': forecasts_8g_inr
+            'Predicted 8g Gold Price (INR)': forecasts_8g_inr,
+            'Low (5%)': low_8g_inr,
+            'High (95%)': high_8g_inr
         })
         
         # Display forecast table
-        st.table(forecast_df.set_index('Date').style.format({'Predicted 8g Gold Price (INR)': '₹{:.2f}'}))
+        st.table(forecast_df.set_index('Date').style.format('₹{:.2f}'))
         
         # Plot forecast
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.plot(forecast_dates, forecasts_8g_inr, marker='o', linestyle='-', color='#FFD700')
-        ax.set_title("5-Day 8g Gold Price Forecast (INR)")
-        ax.set_ylabel("Price (INR)")
-        ax.set_xlabel("Date")
-        ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+        def draw_forecast(ax):
+            ax.fill_between(forecast_dates, low_8g_inr, high_8g_inr, color='#FFD700', alpha=0.25, label='5-95% range')
+            ax.plot(forecast_dates, median_8g_inr, linestyle='--', color='#B8860B', label='Median')
+            ax.plot(forecast_dates, forecasts_8g_inr, marker='o', linestyle='-', color='#FFD700', label='Forecast')
+            ax.set_title(f"{forecast_days}-Day 8g Gold Price Forecast (INR)")
+            ax.set_ylabel("Price (INR)")
+            ax.set_xlabel("Date")
+            ax.legend(loc='upper left')
+            ax.grid(True, alpha=0.3)
+        
+        forecast_key = (frame_version(), (forecast_dates[0], forecast_dates[-1]), "forecast",
+                        tuple(forecasts_8g_inr.round(2)), tuple(bands_usd.ravel().round(2)))
+        st.image(chart_cache.get_or_render(forecast_key, draw_forecast, figsize=(10, 4)))
+
+# Stage timings and cache counters, shown with ?debug=1 or GOLD_DEBUG=1
+if os.environ.get("GOLD_DEBUG") == "1" or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🛠️ Debug: timings", expanded=True):
+        st.table(pd.DataFrame(registry.summary()))
+        st.table(pd.DataFrame(registry.cache_summary()))
 
 # Footer
 st.markdown('<div class="footer">Made with 💛 using Python & Streamlit</div>', unsafe_allow_html=True)
\ No newline at end of file
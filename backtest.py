@@ -0,0 +1,173 @@
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from features import DEFAULT_CONFIG, LEGACY_CONFIG, FeaturePipeline
+from forecast import forecast_paths
+from price_store import load_prices
+
+Fold = namedtuple("Fold", ["number", "train_start", "train_end", "test_start", "test_end"])
+
+# Set in each worker process by _attach_series
+_series = None
+_dates = None
+_shm = None
+
+
+def make_linear_model():
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression()
+
+
+def walk_forward_folds(n, n_folds=5, test_size=None, window="expanding", train_size=None):
+    """Split ``n`` rows into consecutive walk-forward folds.
+
+    Test blocks of ``test_size`` rows sit back to back at the end of the
+    series. With ``window="expanding"`` every fold trains on all rows before
+    its test block; with ``"rolling"`` it trains on the ``train_size`` rows
+    just before it. Positions are half-open ``[start, end)``.
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"window must be 'expanding' or 'rolling', not {window!r}")
+    test_size = test_size or n // (n_folds + 1)
+    train_size = train_size or n - n_folds * test_size
+    first_test = n - n_folds * test_size
+    if test_size < 1 or first_test < 2 or (window == "rolling" and train_size > first_test):
+        raise ValueError(f"Not enough rows ({n}) for {n_folds} folds of {test_size} test rows")
+
+    folds = []
+    for i in range(n_folds):
+        test_start = first_test + i * test_size
+        train_start = 0 if window == "expanding" else test_start - train_size
+        folds.append(Fold(i, train_start, test_start, test_start, test_start + test_size))
+    return folds
+
+
+def _attach_series(name, length):
+    """Worker initializer: map the shared closes and dates without copying them"""
+    global _series, _dates, _shm
+    try:
+        _shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track flag. Pool workers share the parent's
+        # resource tracker (inherited on fork, passed on spawn), which holds
+        # each name once, so unregistering here would drop the parent's own
+        # entry. Only a worker that had to start its own tracker unregisters,
+        # so that tracker doesn't unlink the parent's block when it exits.
+        from multiprocessing import resource_tracker
+        shared_tracker = resource_tracker._resource_tracker._fd is not None
+        _shm = shared_memory.SharedMemory(name=name)
+        if not shared_tracker:
+            resource_tracker.unregister(_shm._name, "shared_memory")
+    _series = np.ndarray((length,), dtype=np.float64, buffer=_shm.buf)
+    _dates = np.ndarray((length,), dtype="datetime64[D]", buffer=_shm.buf, offset=_series.nbytes)
+
+
+def evaluate_fold(fold, horizon, make_model=make_linear_model, series=None, dates=None,
+                  feature_config=DEFAULT_CONFIG):
+    """Fit on the fold's training rows and score 1..``horizon``-day forecasts.
+
+    The model is trained on the same features ``train_model()`` builds
+    from ``feature_config``. Every test row is used as a forecast origin
+    and all origins are forecast together, each from its own preceding
+    closes. Returns a list of per-horizon metric dicts.
+    """
+    closes = _series if series is None else series
+    dates = _dates if series is None else dates
+    pipeline = FeaturePipeline.from_config(feature_config)
+
+    train = slice(fold.train_start, fold.train_end)
+    X, y = pipeline.training_set(closes[train], None if dates is None else dates[train])
+    model = make_model()
+    model.fit(X, y)
+    model.feature_config_ = pipeline.to_config()
+
+    # Origins with a full window of history whose targets all fall inside the test block
+    origins = np.arange(max(fold.test_start, pipeline.window - 1), fold.test_end - horizon)
+    if len(origins) == 0:
+        return []
+    history = closes[origins[:, None] + np.arange(1 - pipeline.window, 0)]
+    predicted = forecast_paths(model, closes[origins], horizon, history, None if dates is None else dates[origins])
+    actual = closes[origins[:, None] + np.arange(1, horizon + 1)]
+    errors = predicted - actual
+
+    mae = np.abs(errors).mean(axis=0)
+    rmse = np.sqrt((errors ** 2).mean(axis=0))
+    mape = (np.abs(errors) / np.abs(actual)).mean(axis=0) * 100
+    return [
+        {"fold": fold.number, "horizon": h + 1, "mae": mae[h], "rmse": rmse[h], "mape": mape[h], "origins": len(origins)}
+        for h in range(horizon)
+    ]
+
+
+def run_backtest(closes, n_folds=5, horizon=5, window="expanding", test_size=None, train_size=None,
+                 make_model=make_linear_model, workers=None, dates=None, feature_config=DEFAULT_CONFIG):
+    """Run a walk-forward backtest with folds spread over a process pool.
+
+    The close series and its dates are copied once into shared memory and
+    every worker maps them read-only, so adding workers doesn't add copies
+    of the data. ``dates`` is needed for calendar features; without it
+    consecutive days are assumed. Returns one row per (fold, horizon) with
+    MAE, RMSE and MAPE.
+    """
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    if dates is None:
+        dates = np.arange(len(closes)).astype("datetime64[D]")
+    dates = np.ascontiguousarray(dates, dtype="datetime64[D]")
+    folds = walk_forward_folds(len(closes), n_folds, test_size, window, train_size)
+    workers = workers or min(len(folds), os.cpu_count() or 1)
+
+    if workers == 1:
+        results = [evaluate_fold(fold, horizon, make_model, closes, dates, feature_config) for fold in folds]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=closes.nbytes + dates.nbytes)
+        try:
+            np.ndarray(closes.shape, dtype=np.float64, buffer=shm.buf)[:] = closes
+            np.ndarray(dates.shape, dtype=dates.dtype, buffer=shm.buf, offset=closes.nbytes)[:] = dates
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_series,
+                                     initargs=(shm.name, len(closes))) as pool:
+                results = list(pool.map(evaluate_fold, folds, [horizon] * len(folds), [make_model] * len(folds),
+                                        [None] * len(folds), [None] * len(folds), [feature_config] * len(folds)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    report = pd.DataFrame([row for rows in results for row in rows])
+    bounds = pd.DataFrame(folds).set_index("number")
+    return report.join(bounds, on="fold")
+
+
+def summarize(report):
+    """Average the per-fold metrics for each horizon"""
+    return report.groupby("horizon")[["mae", "rmse", "mape"]].mean()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the gold price model")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--window", choices=["expanding", "rolling"], default="expanding")
+    parser.add_argument("--test-size", type=int, default=None, help="rows per test block")
+    parser.add_argument("--train-size", type=int, default=None, help="rows per training window (rolling only)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--legacy", action="store_true", help="evaluate the close-only model instead of lag features")
+    args = parser.parse_args()
+
+    df = load_prices()
+    report = run_backtest(df["Close"].to_numpy(), args.folds, args.horizon, args.window,
+                          args.test_size, args.train_size, workers=args.workers, dates=df.index,
+                          feature_config=LEGACY_CONFIG if args.legacy else DEFAULT_CONFIG)
+    dates = df.index.strftime("%Y-%m-%d")
+    report["test_from"] = dates[report["test_start"]]
+    report["test_to"] = dates[report["test_end"] - 1]
+
+    pd.set_option("display.width", 120)
+    print("Per fold and horizon:")
+    print(report[["fold", "test_from", "test_to", "horizon", "mae", "rmse", "mape"]].to_string(index=False))
+    print("\nAverage per horizon:")
+    print(summarize(report).to_string())
@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+
+
+class _Pending:
+    def __init__(self, price, horizon):
+        self.price = price
+        self.horizon = horizon
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class RequestCoalescer:
+    """Merge single-item forecast requests that arrive close together.
+
+    The first caller in a window becomes the leader: it waits ``window``
+    seconds for other callers to queue up, then runs one vectorized
+    ``func(prices, horizon)`` for the whole batch and hands each caller its
+    own row. ``func`` must return a ``(len(prices), horizon)`` array.
+    """
+
+    def __init__(self, func, window=0.002, max_batch=4096):
+        self.func = func
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = []
+        self._batch_full = threading.Event()
+
+    def submit(self, price, horizon):
+        """Forecast ``horizon`` days from one price, batched with concurrent callers"""
+        item = _Pending(float(price), int(horizon))
+        with self._lock:
+            self._pending.append(item)
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._batch_full.set()
+
+        if leader:
+            self._batch_full.wait(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._batch_full.clear()
+            self._run(batch)
+        else:
+            item.done.wait()
+
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _run(self, batch):
+        try:
+            prices = np.fromiter((item.price for item in batch), dtype=np.float64, count=len(batch))
+            paths = self.func(prices, max(item.horizon for item in batch))
+            for item, row in zip(batch, paths):
+                item.result = row[:item.horizon]
+        except Exception as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
@@ -0,0 +1,56 @@
+"""Model load cost: cold start and per-rerun latency, before and after the registry.
+
+"Before" is the old ``pickle.load`` of model/model.pkl on every Streamlit
+rerun; "after" is ``model_registry.load_model``, which serves linear models
+from model/model.json and caches per process.
+
+    python benchmarks/bench_model_load.py
+"""
+import os
+import pickle
+import subprocess
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from model_registry import MODEL_PATH, load_model  # noqa: E402
+
+COLD_BEFORE = "import pickle; pickle.load(open('model/model.pkl', 'rb'))"
+COLD_AFTER = "from model_registry import load_model; load_model()"
+RERUNS = 1000
+
+
+def cold_start(code, runs=5):
+    """Best-of-``runs`` wall time for a fresh interpreter to load the model"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT_DIR, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_rerun(func):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        func()
+    return (time.perf_counter() - start) / RERUNS
+
+
+def pickle_load():
+    with open(MODEL_PATH, "rb") as f:
+        return pickle.load(f)
+
+
+def main():
+    os.chdir(ROOT_DIR)
+    warnings.simplefilter("ignore")
+    print(f"cold start  before: {cold_start(COLD_BEFORE) * 1000:8.1f} ms   after: {cold_start(COLD_AFTER) * 1000:8.1f} ms")
+    print(f"per rerun   before: {per_rerun(pickle_load) * 1e6:8.1f} us   after: {per_rerun(load_model) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
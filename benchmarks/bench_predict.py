@@ -0,0 +1,59 @@
+"""Throughput of model prediction at batch sizes 1, 64 and 4096.
+
+Compares calling the model's forecast directly, posting batches to
+``/api/predict`` through Flask's test client, and concurrent single-price
+requests going through the request coalescer.
+
+    python benchmarks/bench_predict.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+
+import index  # noqa: E402
+
+BATCH_SIZES = [1, 64, 4096]
+
+
+def throughput(func, items, min_time=0.5):
+    """Run ``func`` repeatedly and return items processed per second"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls * items / elapsed
+
+
+def main():
+    client = index.app.test_client()
+    rng = np.random.default_rng(0)
+
+    print(f"{'batch':>6} {'direct/s':>14} {'http/s':>14} {'coalesced/s':>14}")
+    for size in BATCH_SIZES:
+        prices = rng.uniform(1000, 4000, size)
+        payload = {"prices": prices.tolist(), "horizon": 1}
+
+        direct = throughput(lambda: index.predict_usd(prices, 1), size)
+        http = throughput(lambda: client.post("/api/predict", json=payload), size)
+
+        # `size` concurrent single-price requests, merged by the coalescer
+        with ThreadPoolExecutor(max_workers=min(size, 64)) as pool:
+            def burst():
+                list(pool.map(lambda p: index.predict_coalescer.submit(p, 1), prices))
+            coalesced = throughput(burst, size)
+
+        print(f"{size:>6} {direct:>14,.0f} {http:>14,.0f} {coalesced:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
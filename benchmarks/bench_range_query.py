@@ -0,0 +1,53 @@
+"""Date-range filtering on a synthetic multi-decade, intraday series.
+
+Compares the old per-row ``.date`` mask with ``gold_data.filter_dates``,
+which finds both bounds by binary search. The mask grows linearly with the
+number of rows; the binary search should stay roughly flat (O(log n)).
+
+    python benchmarks/bench_range_query.py
+"""
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gold_data import filter_dates  # noqa: E402
+
+# 30 years at increasingly fine resolution
+SERIES = [("1D", 11_000), ("1h", 263_000), ("5min", 3_150_000), ("1min", 15_800_000)]
+# The per-row mask is too slow to be worth timing on the largest series
+MAX_MASK_ROWS = 3_200_000
+START, END = date(2010, 3, 1), date(2011, 3, 1)
+
+
+def best_of(func, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'freq':>6} {'rows':>12} {'mask ms':>10} {'searchsorted us':>16}")
+    for freq, rows in SERIES:
+        index = pd.date_range("1995-01-01", periods=rows, freq=freq, name="Date")
+        df = pd.DataFrame({"Close": np.random.default_rng(0).random(rows)}, index=index)
+
+        fast = best_of(lambda: filter_dates(df, START, END), 50)
+        if rows <= MAX_MASK_ROWS:
+            mask = best_of(lambda: df.loc[(df.index.date >= START) & (df.index.date <= END)], 3)
+            mask_ms = f"{mask * 1000:10.1f}"
+        else:
+            mask_ms = f"{'-':>10}"
+        print(f"{freq:>6} {rows:>12,} {mask_ms} {fast * 1e6:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
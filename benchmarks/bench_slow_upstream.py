@@ -0,0 +1,107 @@
+"""Latency of /api/gold-price while the upstream price source is slow.
+
+Serves the endpoint from several client threads against a local stub
+upstream that takes ``--delay`` seconds per download, with a short cache
+TTL so refreshes happen throughout the run. Compares refreshing in the
+request thread with refreshing in the background; with background refresh
+the p99 should match that of a fast upstream and no request should wait
+on a download ("blocked" counts requests over 500 ms). "errors" counts
+responses other than 200.
+
+    python benchmarks/bench_slow_upstream.py [--delay 2] [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+
+import index  # noqa: E402
+from price_cache import PriceCache  # noqa: E402
+
+CLIENTS = 8
+TTL = 0.25
+
+# Requests slower than this count as having waited on the upstream
+BLOCKED_MS = 500
+
+
+def stub_upstream(delay):
+    """Fake Yahoo Finance: the history on first call, then one new day per call"""
+    dates = pd.bdate_range(end="2024-12-31", periods=4000)
+    history = pd.DataFrame({"Close": np.linspace(1200, 2600, len(dates))}, index=dates)
+
+    def fetch(start=None):
+        time.sleep(delay)
+        if start is None:
+            return history
+        return pd.DataFrame({"Close": [2600.0]}, index=[pd.Timestamp(start)])
+    return fetch
+
+
+def stub_fx(delay):
+    """Fake FX source: a constant rate, as slow as the price upstream"""
+    def fetch(start=None):
+        time.sleep(delay)
+        return pd.DataFrame({"Close": [83.0]}, index=[pd.Timestamp(start or "2010-01-01")])
+    return fetch
+
+
+def run(delay, background, seconds):
+    """Hit /api/gold-price from CLIENTS threads; returns latencies in ms and the error count"""
+    index.price_cache = PriceCache(stub_upstream(delay), ttl=TTL, background=background, timeout=delay + 5)
+    index.fx_caches = {
+        currency: PriceCache(stub_fx(delay), ttl=TTL, background=background, timeout=delay + 5)
+        for currency in index.fx_caches
+    }
+    index.price_cache.get()
+    index.get_gold_price_snapshot()
+
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        http = index.app.test_client()
+        own = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            failed += http.get("/api/gold-price").status_code != 200
+            own.append(time.perf_counter() - start)
+        latencies.extend(own)
+        errors.append(failed)
+
+    threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies) * 1000, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds per stub download")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    args = parser.parse_args()
+
+    print(f"{'refresh':>10} {'upstream':>9} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'blocked':>8} "
+          f"{'errors':>7}")
+    for background in (False, True):
+        for delay in (0.0, args.delay):
+            ms, errors = run(delay, background, args.seconds)
+            mode = "background" if background else "inline"
+            print(f"{mode:>10} {delay:>8.1f}s {len(ms):>9} {np.percentile(ms, 50):>8.2f} "
+                  f"{np.percentile(ms, 99):>8.2f} {ms.max():>9.2f} {(ms > BLOCKED_MS).sum():>8} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Benchmark suite for the data, model and API hot paths, written as JSON.
+
+Runs offline on the bundled data/gold_data.csv and on synthetic series of
+4k, 100k and 1M rows, timing: CSV load into the binary store, store load,
+the FX as-of join and derived columns, a one-year range filter, stats,
+single and batch ``predict``, a 5-day forecast (close-only and lag-feature
+models) and a full ``/api/gold-price`` request through Flask's test client
+with the upstream stubbed. Each timing is the median and best of several
+runs, in milliseconds. The 1M-row series is hourly, since a million daily
+dates do not fit pandas' timestamp range, so the load steps (which store
+one close per day) are skipped for it.
+
+Results go to benchmarks/results/<commit>.json; pass ``--compare`` with an
+earlier file to print the ratio for every timing.
+
+    python benchmarks/bench_suite.py [--sizes 4000 100000] [--compare benchmarks/results/abc1234.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+
+import index  # noqa: E402
+from features import DEFAULT_CONFIG, FeaturePipeline  # noqa: E402
+from forecast import forecast_paths  # noqa: E402
+from fx_rates import asof_rates  # noqa: E402
+from gold_data import build_gold_frame, filter_dates, trailing_slice  # noqa: E402
+from model_registry import LinearParams, load_model  # noqa: E402
+from price_cache import PriceCache  # noqa: E402
+from price_stats import StatsIndex  # noqa: E402
+from price_store import CSV_PATH, convert_csv, load_prices, read_csv_prices  # noqa: E402
+
+SIZES = [4_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# Daily dates fit in pandas' timestamp range up to a few hundred years
+MAX_DAILY_ROWS = 150_000
+
+
+def measure(func, min_time=0.2, max_runs=200, min_runs=3):
+    """Run ``func`` until ``min_time`` has passed; returns median and best time in ms"""
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < min_runs or (time.perf_counter() < deadline and len(times) < max_runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"median_ms": float(np.median(times)) * 1000, "best_ms": float(min(times)) * 1000, "runs": len(times)}
+
+
+def synthetic_prices(rows, seed=0):
+    """Random-walk closes; daily dates when they fit, hourly otherwise"""
+    rng = np.random.default_rng(seed)
+    freq = "D" if rows <= MAX_DAILY_ROWS else "h"
+    dates = pd.date_range(end="2024-12-31", periods=rows, freq=freq, name="Date")
+    closes = 1200 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({"Close": closes}, index=dates), freq
+
+
+def synthetic_fx(dates, seed=1):
+    """Daily USD/INR rates covering ``dates``"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(dates[0].normalize(), dates[-1].normalize(), freq="D")
+    return pd.DataFrame({"Close": 75 * np.exp(np.cumsum(rng.normal(0, 0.002, len(days))))}, index=days)
+
+
+def bench_load(prices, tmp):
+    """CSV parse and conversion into the binary store, then loading the store"""
+    csv_path = os.path.join(tmp, "prices.csv")
+    store_path = os.path.join(tmp, "prices.bin")
+    prices.to_csv(csv_path, date_format="%Y-%m-%d")
+    return {
+        "csv_parse": measure(lambda: read_csv_prices(csv_path)),
+        "csv_to_store": measure(lambda: convert_csv(csv_path, store_path)),
+        "store_load": measure(lambda: load_prices(store_path, csv_path)),
+    }
+
+
+def bench_frame(prices, fx):
+    """FX join, derived columns, range filter and stats on an in-memory frame"""
+    close, dates = prices["Close"].to_numpy(), prices.index
+    rates = asof_rates(fx, dates, "INR")
+    df = build_gold_frame(close, dates, rates)
+    start = dates[-1] - pd.Timedelta(days=730)
+    end = dates[-1] - pd.Timedelta(days=365)
+    stats = StatsIndex(df["8g_Gold_INR"].to_numpy())
+    last_year = trailing_slice(dates, 365)
+    return {
+        "fx_asof_join": measure(lambda: asof_rates(fx, dates, "INR")),
+        "derived_columns": measure(lambda: build_gold_frame(close, dates, rates)),
+        "range_filter": measure(lambda: filter_dates(df, start, end)),
+        "stats_build": measure(lambda: StatsIndex(df["8g_Gold_INR"].to_numpy())),
+        "stats_query": measure(lambda: (stats.mean(last_year), stats.min(last_year), stats.max(last_year))),
+    }
+
+
+def feature_model(prices):
+    """Least-squares fit on the default lag features, as LinearParams"""
+    pipeline = FeaturePipeline.from_config(DEFAULT_CONFIG)
+    X, y = pipeline.training_set(prices["Close"].to_numpy()[-5000:], prices.index[-5000:])
+    beta = np.linalg.lstsq(np.column_stack([X, np.ones(len(X))]), y, rcond=None)[0]
+    return LinearParams(beta[:-1], beta[-1], {"feature_config": DEFAULT_CONFIG})
+
+
+def bench_model(prices):
+    """Single and batch predict plus 5-day forecasts"""
+    model = load_model(os.path.join(ROOT_DIR, "model", "model.pkl"), os.path.join(ROOT_DIR, "model", "model.json"))
+    lagged = feature_model(prices)
+    close = prices["Close"].to_numpy()
+    single, batch = close[-1:].reshape(1, 1), close.reshape(-1, 1)
+    history, last_date = close[:-1], prices.index[-1]
+    return {
+        "predict_single": measure(lambda: model.predict(single)),
+        "predict_batch": measure(lambda: model.predict(batch)),
+        "forecast_5d": measure(lambda: forecast_paths(model, close[-1], 5)),
+        "forecast_5d_features": measure(lambda: forecast_paths(lagged, close[-1], 5, history, last_date)),
+    }
+
+
+def bench_api(prices, fx):
+    """Full /api/gold-price requests with the price and FX upstreams stubbed"""
+    index.price_cache = PriceCache(lambda start=None: prices if start is None else None)
+    index.fx_caches = {currency: PriceCache(lambda start=None: fx if start is None else None)
+                       for currency in index.fx_caches}
+    client = index.app.test_client()
+
+    def cold():
+        # Drop the per-version caches so the payload is rebuilt from the frame
+        index._snapshots.clear()
+        index._ounce_series.clear()
+        client.get("/api/gold-price")
+
+    client.get("/api/gold-price")
+    return {
+        "api_gold_price_cold": measure(cold),
+        "api_gold_price_warm": measure(lambda: client.get("/api/gold-price")),
+        "api_gold_price_projection": measure(lambda: client.get("/api/gold-price?weight=1&unit=tola&currency=EUR")),
+    }
+
+
+def run_size(label, prices, freq, tmp):
+    fx = synthetic_fx(prices.index)
+    print(f"{label}: {len(prices):,} rows ({freq})")
+    results = {}
+    if freq == "D":
+        results.update(bench_load(prices, tmp))
+    results.update(bench_frame(prices, fx))
+    results.update(bench_model(prices))
+    results.update(bench_api(prices, fx))
+    for name, timing in results.items():
+        print(f"  {name:<28} {timing['median_ms']:>10.3f} ms  (best {timing['best_ms']:.3f})")
+    return {"rows": len(prices), "freq": freq, "timings": results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline_path):
+    """Print current/baseline median ratios for every timing both runs have"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit')} ({baseline_path}); ratio > 1 is slower")
+    for label, run in current["runs"].items():
+        old = baseline["runs"].get(label)
+        if old is None:
+            continue
+        for name, timing in run["timings"].items():
+            if name in old["timings"]:
+                ratio = timing["median_ms"] / old["timings"][name]["median_ms"]
+                print(f"  {label:>8} {name:<28} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the data, model and API hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="synthetic row counts")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "runs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        bundled = load_prices(os.path.join(tmp, "bundled.bin"), os.path.join(ROOT_DIR, CSV_PATH))
+        report["runs"]["bundled"] = run_size("bundled", bundled, "D", tmp)
+        for rows in args.sizes:
+            prices, freq = synthetic_prices(rows)
+            report["runs"][str(rows)] = run_size(str(rows), prices, freq, tmp)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Cold-start budget for the API worker, measured with ``python -X importtime``.
+
+Imports ``api/index.py`` in a fresh interpreter and fails when the
+cumulative import time goes over ``--budget`` milliseconds or when a
+module that should load lazily (pandas, yfinance, matplotlib, sklearn) is
+imported at module load. A second fresh interpreter then serves
+``/api/gold-price`` from the precomputed snapshot, with the upstream
+stubbed to never answer, and checks pandas is still not imported. Import
+times vary between machines, so take the best of ``--runs`` runs.
+tests/test_import_time.py runs the same checks under pytest.
+
+    python benchmarks/check_import_time.py [--budget 500] [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT_DIR, "api")
+
+# Cumulative milliseconds allowed for ``import index`` (about 250 ms on one core)
+IMPORT_BUDGET_MS = 500
+
+LAZY_MODULES = ("pandas", "yfinance", "matplotlib", "seaborn", "sklearn")
+
+SERVE_FROM_SNAPSHOT = """
+import sys, threading
+import index
+from price_cache import PriceCache
+
+never = threading.Event()
+index.price_cache = PriceCache(lambda start=None: never.wait(), background=True, timeout=60)
+response = index.app.test_client().get("/api/gold-price")
+assert response.status_code == 200, response.status_code
+assert response.get_json()["current_date"], response.get_json()
+print(" ".join(sorted(m for m in sys.modules if m.split(".")[0] in {lazy!r})))
+"""
+
+
+def import_times():
+    """Cumulative import time in ms of index and every top-level module it loads"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import index"], cwd=API_DIR,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def best_import_times(runs=3):
+    """The import_times() run with the fastest ``import index``"""
+    return min((import_times() for _ in range(runs)), key=lambda times: times["index"])
+
+
+def serve_from_snapshot():
+    """Serve /api/gold-price from the snapshot in a fresh interpreter; returns the completed process.
+
+    Its stdout lists the lazily imported modules that were loaded anyway.
+    """
+    code = SERVE_FROM_SNAPSHOT.format(lazy=set(LAZY_MODULES))
+    return subprocess.run([sys.executable, "-c", code], cwd=API_DIR, capture_output=True, text=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="allowed import time in ms")
+    parser.add_argument("--runs", type=int, default=3, help="imports to take the best of")
+    args = parser.parse_args()
+
+    best = best_import_times(args.runs)
+    failures = []
+
+    print(f"import index: {best['index']:.1f} ms (budget {args.budget:g} ms)")
+    for name in ("flask", "numpy", "metrics", "model_registry", "price_cache", "fx_rates"):
+        if name in best:
+            print(f"  {name:<16} {best[name]:>8.1f} ms")
+    if best["index"] > args.budget:
+        failures.append(f"import took {best['index']:.1f} ms, over the {args.budget:g} ms budget")
+    eager = [name for name in LAZY_MODULES if name in best]
+    if eager:
+        failures.append(f"imported at module load: {', '.join(eager)}")
+
+    served = serve_from_snapshot()
+    if served.returncode != 0:
+        failures.append(f"serving the snapshot failed:\n{served.stderr.strip()}")
+    elif served.stdout.strip():
+        failures.append(f"serving the snapshot imported: {served.stdout.strip()}")
+    else:
+        print("/api/gold-price served from the snapshot without pandas")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from fx_rates import load_fx  # noqa: E402
+from index import SNAPSHOT_PATH, write_snapshot_artifact  # noqa: E402
+from price_store import load_prices  # noqa: E402
+
+
+def build_snapshot(path=SNAPSHOT_PATH):
+    """Write the default /api/gold-price response from the stored prices for cold starts"""
+    df = load_prices()
+    snapshot = write_snapshot_artifact(df, load_fx("INR"), path)
+    print(f"Snapshot for {df.index.max().date()} saved to {path} ({len(snapshot.body)} bytes)")
+    return snapshot
+
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from metrics import record_cache
+
+# Rendered charts kept per process
+MAX_CHARTS = 64
+
+
+class ChartCache:
+    """Bounded LRU cache of rendered chart images (PNG bytes).
+
+    Keys should identify everything the picture depends on, e.g.
+    ``(data_version, date_range, chart_type)``. Charts are drawn on a
+    standalone ``Figure`` rather than through pyplot, so nothing is left in
+    pyplot's global figure registry, and each figure is cleared as soon as
+    it has been saved.
+    """
+
+    def __init__(self, max_entries=MAX_CHARTS):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def get_or_render(self, key, draw, figsize=(10, 5), dpi=100):
+        """Return the PNG for ``key``, calling ``draw(ax)`` to render it on a miss"""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                record_cache("chart", True)
+                return image
+            self.misses += 1
+        record_cache("chart", False)
+
+        image = render_png(draw, figsize, dpi)
+
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+
+def render_png(draw, figsize=(10, 5), dpi=100):
+    """Draw a chart with ``draw(ax)`` and return it as PNG bytes"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    try:
+        draw(fig.subplots())
+        buf = BytesIO()
+        fig.savefig(buf, format="png")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+chart_cache = ChartCache()
@@ -1,20 +1,156 @@
+import argparse
+from datetime import timedelta
+
+import numpy as np
 import yfinance as yf
 import pandas as pd
 import os
 
-def fetch_data():
+from fx_rates import CURRENCIES, download_fx
+from price_store import CSV_PATH, STORE_PATH, append_store, convert_csv, open_store, read_header, to_records, write_store
+
+# Days before the last stored date that are re-fetched to catch revised bars
+OVERLAP_DAYS = 5
+
+# Days before the last stored date that backfill_data() looks for gaps in; older
+# gaps are exchange holidays the upstream has already failed to return
+BACKFILL_LOOKBACK_DAYS = 30
+
+def download_closes(start="2010-01-01", end=None):
+    """Download GC=F closes from Yahoo Finance (``end`` is exclusive)"""
+    data = yf.download("GC=F", start=start, end=end)
+    return data[["Close"]].dropna()
+
+def _closes(data):
+    """Split a downloaded frame into date and close arrays"""
+    if data is None or len(data) == 0:
+        return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.float64)
+    return data.index.to_numpy(dtype="datetime64[D]"), np.asarray(data["Close"], dtype=np.float64).ravel()
+
+def _validate(dates, closes):
+    """Reject downloads with non-positive or non-finite closes"""
+    bad = ~np.isfinite(closes) | (closes <= 0)
+    if bad.any():
+        raise ValueError(f"Invalid closes for {dates[bad][:5].tolist()}")
+
+def fetch_data(downloader=download_closes, path=STORE_PATH):
     """Fetch historical gold price data from Yahoo Finance"""
     print("Fetching gold price data...")
-    data = yf.download("GC=F", start="2010-01-01")
-    data = data[["Close"]].dropna()
-    
-    # Create data directory if it doesn't exist
-    os.makedirs("data", exist_ok=True)
+    data = downloader(start="2010-01-01")
+    dates, closes = _closes(data)
+    _validate(dates, closes)
     
-    # Save to CSV
-    data.to_csv("data/gold_data.csv")
-    print(f"Data saved to data/gold_data.csv with {len(data)} records")
+    # Save to the binary price store (creates the data directory if needed)
+    count = write_store(dates, closes, path)
+    print(f"Data saved to {path} with {count} records")
     return data
 
+def update_data(downloader=download_closes, path=STORE_PATH, csv_path=CSV_PATH, overlap_days=OVERLAP_DAYS):
+    """Fetch only the days missing from the store and append them.
+
+    The last ``overlap_days`` already stored are fetched again and compared.
+    If the upstream revised any of them the store is rewritten atomically;
+    otherwise the new rows are appended in place. Returns the number of rows
+    added or changed.
+    """
+    if not os.path.exists(path):
+        if not os.path.exists(csv_path):
+            return len(fetch_data(downloader, path))
+        convert_csv(csv_path, path)
+
+    header = read_header(path)
+    if header.last_date is None:
+        return len(fetch_data(downloader, path))
+
+    start = pd.Timestamp(header.last_date) - timedelta(days=overlap_days)
+    dates, closes = _closes(downloader(start=start.strftime("%Y-%m-%d")))
+    _validate(dates, closes)
+    fetched = to_records(dates, closes)
+
+    stored = open_store(path)
+    tail = stored[stored["date"] >= fetched["date"][0]] if len(fetched) else stored[:0]
+    common, stored_idx, fetched_idx = np.intersect1d(tail["date"], fetched["date"], return_indices=True)
+    revised = ~np.isclose(tail["close"][stored_idx], fetched["close"][fetched_idx])
+
+    if revised.any():
+        print(f"Upstream revised {int(revised.sum())} stored bars, rewriting {path}")
+        all_dates = np.concatenate([stored["date"], fetched["date"]])
+        all_closes = np.concatenate([stored["close"], fetched["close"]])
+        del stored, tail
+        write_store(all_dates, all_closes, path)
+        return int(revised.sum()) + int((fetched["date"] > header.last_date).sum())
+
+    del stored, tail
+    added = append_store(fetched["date"], fetched["close"], path)
+    print(f"Appended {added} new records to {path}")
+    return added
+
+def find_gaps(dates):
+    """Return the business days between the first and last date that have no row"""
+    dates = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[ns]"))
+    if len(dates) == 0:
+        return dates
+    return pd.bdate_range(dates.min(), dates.max()).difference(dates)
+
+def gap_runs(gaps):
+    """Split sorted missing business days into runs of consecutive business days"""
+    days = np.asarray(gaps, dtype="datetime64[D]")
+    if len(days) == 0:
+        return []
+    breaks = np.flatnonzero(np.busday_count(days[:-1], days[1:]) > 1) + 1
+    return np.split(days, breaks)
+
+def backfill_data(downloader=download_closes, path=STORE_PATH, lookback_days=BACKFILL_LOOKBACK_DAYS):
+    """Re-fetch missing business days in the last ``lookback_days`` and fill what upstream has.
+
+    Each run of consecutive missing days is fetched on its own, so the
+    download covers only the gaps. Exchange holidays show up as gaps too;
+    the upstream doesn't return them, so they stay missing, and once they
+    are older than the lookback they are not asked for again (None looks
+    at the whole history).
+    """
+    stored = open_store(path)
+    gaps = find_gaps(stored["date"])
+    if lookback_days is not None and len(gaps):
+        gaps = gaps[gaps > pd.Timestamp(stored["date"][-1]) - timedelta(days=lookback_days)]
+    if len(gaps) == 0:
+        return 0
+
+    found_dates, found_closes = [], []
+    for run in gap_runs(gaps):
+        end = run[-1] + np.timedelta64(1, "D")
+        dates, closes = _closes(downloader(start=str(run[0]), end=str(end)))
+        _validate(dates, closes)
+        missing = np.isin(dates, run)
+        found_dates.append(dates[missing])
+        found_closes.append(closes[missing])
+    filled = sum(len(dates) for dates in found_dates)
+    if filled == 0:
+        return 0
+
+    all_dates = np.concatenate([stored["date"]] + found_dates)
+    all_closes = np.concatenate([stored["close"]] + found_closes)
+    del stored
+    write_store(all_dates, all_closes, path)
+    print(f"Backfilled {filled} of {len(gaps)} missing business days")
+    return filled
+
 if __name__ == "__main__":
-    fetch_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Download gold price data")
+    parser.add_argument("--incremental", action="store_true", help="only fetch days missing from the store")
+    parser.add_argument("--backfill", action="store_true", help="re-fetch missing business days")
+    parser.add_argument("--backfill-days", type=int, default=BACKFILL_LOOKBACK_DAYS,
+                        help="how far back --backfill looks for gaps (0 for the whole history)")
+    parser.add_argument("--fx", action="store_true", help="also download USD exchange rates for every currency")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        update_data()
+    else:
+        fetch_data()
+    if args.backfill:
+        backfill_data(lookback_days=args.backfill_days or None)
+    if args.fx:
+        for currency in CURRENCIES:
+            if currency != "USD":
+                print(f"Saved {download_fx(currency)} USD/{currency} rates")
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Points worth drawing on a 10-inch wide figure at 100 dpi
+MAX_PLOT_POINTS = 1000
+
+
+def lttb_indices(x, y, threshold):
+    """Pick ``threshold`` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The rest of the series is
+    split into ``threshold - 2`` buckets, and from each bucket the point
+    forming the largest triangle with the previously chosen point and the
+    average of the next bucket is kept, which preserves peaks and troughs;
+    the global minimum and maximum are always kept too (with ``threshold``
+    3 there is room for only one of them). Returns the positions of the
+    chosen points in ascending order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    chosen = np.empty(threshold, dtype=np.int64)
+    chosen[0] = 0
+    chosen[-1] = n - 1
+
+    # Average of every bucket, used as the third point of the triangle
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        chosen[i + 1] = a
+
+    # Make sure the global extremes survive even if a triangle missed them
+    first, second = sorted((int(np.argmin(y)), int(np.argmax(y))))
+    slots = [int(np.searchsorted(edges, extreme, side="right")) for extreme in (first, second)]
+    if slots[0] == slots[1] and 0 < first and second < n - 1:
+        # Both in one bucket: one of them takes the slot of a neighbouring
+        # bucket, which keeps the positions in ascending order
+        if slots[1] + 1 < threshold - 1:
+            slots[1] += 1
+        elif slots[0] - 1 > 0:
+            slots[0] -= 1
+    for extreme, slot in zip((first, second), slots):
+        if 0 < extreme < n - 1:
+            chosen[slot] = extreme
+    return chosen
+
+
+def downsample_frame(df, column, threshold=MAX_PLOT_POINTS):
+    """Return at most ``threshold`` rows of ``df`` that keep the shape of ``column``"""
+    if len(df) <= threshold:
+        return df
+    x = df.index.asi8.astype(np.float64)
+    return df.iloc[lttb_indices(x, df[column].to_numpy(), threshold)]
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Features used by train_model() by default
+DEFAULT_CONFIG = {"lags": 5, "windows": [5, 20], "calendar": True}
+
+# What models trained before the pipeline existed see: today's close only
+LEGACY_CONFIG = {"lags": 1, "windows": [], "calendar": False}
+
+
+class FeaturePipeline:
+    """Build model features from a close series with strided sliding windows.
+
+    Each row describes one day ``t`` from the ``window`` closes ending at
+    ``t`` (oldest first): the last ``lags`` closes, the 1-day return, the
+    rolling mean and return volatility over each of ``windows``, and
+    optionally the weekday and month of ``t``. Windows are zero-copy views
+    of the series, so the cost is one pass per feature, and rows can be
+    built for just the newest days or for many simulated paths at once.
+    """
+
+    def __init__(self, lags=1, windows=(), calendar=False):
+        self.lags = int(lags)
+        self.windows = [int(w) for w in windows]
+        self.calendar = bool(calendar)
+        if self.lags < 1:
+            raise ValueError("lags must be at least 1")
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a pipeline from a config dict; None or a plain column list means legacy"""
+        if not isinstance(config, dict):
+            config = LEGACY_CONFIG
+        return cls(config.get("lags", 1), config.get("windows", ()), config.get("calendar", False))
+
+    def to_config(self):
+        return {"lags": self.lags, "windows": list(self.windows), "calendar": self.calendar}
+
+    @property
+    def is_legacy(self):
+        """True when the only feature is today's close"""
+        return self.lags == 1 and not self.windows and not self.calendar
+
+    @property
+    def window(self):
+        """Number of closes (ending at day t) needed to build the row for day t"""
+        if self.is_legacy:
+            return 1
+        return max([self.lags, 2] + [w + 1 for w in self.windows])
+
+    @property
+    def names(self):
+        names = [f"close_lag{i}" for i in range(self.lags)]
+        if not self.is_legacy:
+            names.append("return_1")
+        for w in self.windows:
+            names += [f"mean_{w}", f"volatility_{w}"]
+        if self.calendar:
+            names += ["dayofweek", "month"]
+        return names
+
+    def transform_windows(self, windows, dates=None):
+        """Features for rows whose close histories are given as a ``(rows, window)`` matrix.
+
+        ``dates`` holds the date of each row (or one date for all rows) and
+        is only needed for calendar features.
+        """
+        windows = np.asarray(windows, dtype=np.float64)
+        if self.is_legacy:
+            return windows[:, -1:].copy()
+
+        columns = [windows[:, -1 - i] for i in range(self.lags)]
+        returns = windows[:, 1:] / windows[:, :-1] - 1
+        columns.append(returns[:, -1])
+        for w in self.windows:
+            columns.append(windows[:, -w:].mean(axis=1))
+            columns.append(returns[:, -w:].std(axis=1))
+        if self.calendar:
+            if dates is None:
+                raise ValueError("dates are required for calendar features")
+            dates = pd.DatetimeIndex(np.atleast_1d(np.asarray(dates, dtype="datetime64[ns]")))
+            columns.append(np.broadcast_to(dates.dayofweek.to_numpy(dtype=np.float64), (len(windows),)))
+            columns.append(np.broadcast_to(dates.month.to_numpy(dtype=np.float64), (len(windows),)))
+        return np.column_stack(columns)
+
+    def transform(self, closes, dates=None, start=None):
+        """Feature rows for every day from ``start`` on that has a full window of history.
+
+        Row ``i`` of the result describes day ``first + i`` where ``first``
+        is ``max(start, window - 1)``. Passing ``start`` only computes the
+        newest rows, e.g. after appending data, without touching the rest
+        of the history. Returns ``(X, first)``.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        first = max(self.window - 1, start or 0)
+        if first >= len(closes):
+            return np.empty((0, len(self.names))), first
+        views = sliding_window_view(closes[first - self.window + 1:], self.window)
+        row_dates = None if dates is None else np.asarray(dates)[first:]
+        return self.transform_windows(views, row_dates), first
+
+    def training_set(self, closes, dates=None):
+        """Features for each day and the next day's close as the target"""
+        closes = np.asarray(closes, dtype=np.float64)
+        X, first = self.transform(closes, dates)
+        return X[:-1], closes[first + 1:]
+
+
+class RollingFeatures:
+    """Feature rows for many paths that grow by one close per step.
+
+    Starts from a ``(paths, pipeline.window)`` matrix of closes (newest
+    last) and keeps running sums of closes, returns and squared returns per
+    rolling window, so each ``push`` updates the rolling means and
+    volatilities in O(paths * len(windows)) instead of recomputing them
+    over the whole window. Rows match ``FeaturePipeline.transform_windows``
+    up to rounding. ``steps`` is the number of closes that will be pushed.
+    """
+
+    def __init__(self, pipeline, windows, steps):
+        windows = np.asarray(windows, dtype=np.float64)
+        self.pipeline = pipeline
+        n, width = windows.shape
+        self.t = width - 1
+        # Stored time-major so every step reads and writes contiguous rows
+        self.closes = np.empty((width + steps, n))
+        self.closes[:width] = windows.T
+        # returns[j] is the return from close j to close j + 1
+        self.returns = np.empty((width - 1 + steps, n))
+        np.divide(self.closes[1:width], self.closes[:width - 1], out=self.returns[:width - 1])
+        self.returns[:width - 1] -= 1
+        self.sums = {w: self.closes[width - w:width].sum(axis=0) for w in pipeline.windows}
+        recent = {w: self.returns[width - 1 - w:width - 1] for w in pipeline.windows}
+        self.return_sums = {w: r.sum(axis=0) for w, r in recent.items()}
+        self.square_sums = {w: (r * r).sum(axis=0) for w, r in recent.items()}
+        self.columns = np.empty((len(pipeline.names), n))
+
+    def features(self, dates=None):
+        """Feature rows for the newest close of every path (a view reused between calls)"""
+        t, columns = self.t, self.columns
+        lags = self.pipeline.lags
+        columns[:lags] = self.closes[t - lags + 1:t + 1][::-1]
+        columns[lags] = self.returns[t - 1]
+        col = lags + 1
+        for w in self.pipeline.windows:
+            np.divide(self.sums[w], w, out=columns[col])
+            mean = self.return_sums[w] / w
+            variance = self.square_sums[w] / w - mean * mean
+            np.sqrt(np.maximum(variance, 0, out=variance), out=columns[col + 1])
+            col += 2
+        if self.pipeline.calendar:
+            if dates is None:
+                raise ValueError("dates are required for calendar features")
+            days = np.asarray(dates, dtype="datetime64[D]")
+            # 1970-01-01 was a Thursday (Monday is 0)
+            columns[col] = (days.astype(np.int64) + 3) % 7
+            columns[col + 1] = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        return columns.T
+
+    def push(self, closes):
+        """Append the next close of every path"""
+        self.t += 1
+        t = self.t
+        self.closes[t] = closes
+        new = self.returns[t - 1]
+        np.divide(self.closes[t], self.closes[t - 1], out=new)
+        new -= 1
+        for w in self.pipeline.windows:
+            old = self.returns[t - 1 - w]
+            self.sums[w] += self.closes[t] - self.closes[t - w]
+            self.return_sums[w] += new - old
+            self.square_sums[w] += new * new - old * old
+
+
+def pipeline_for(model):
+    """Return the feature pipeline a model was trained with"""
+    config = getattr(model, "feature_config_", None)
+    if config is None:
+        config = getattr(model, "metadata", {}).get("feature_config")
+    return FeaturePipeline.from_config(config)
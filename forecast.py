@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from features import RollingFeatures, pipeline_for
+
+# Recent one-day errors bootstrapped into simulated paths
+RESIDUAL_WINDOW = 500
+
+# Paths simulated per forecast and the percentiles reported from them
+SIMULATED_PATHS = 10_000
+INTERVAL_QUANTILES = (5, 50, 95)
+
+
+def linear_params(model):
+    """Return ``(coef, intercept)`` for a single-feature linear model, else None"""
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None:
+        return None
+    coef = np.ravel(coef)
+    if coef.shape != (1,):
+        return None
+    return float(coef[0]), float(np.ravel(intercept)[0])
+
+
+def forecast_paths(model, start_prices, horizon, history=None, start_date=None):
+    """Forecast ``horizon`` days ahead for every starting price at once.
+
+    Returns an array of shape ``(len(start_prices), horizon)`` where column
+    ``k`` is the prediction ``k + 1`` days ahead. For a one-feature linear
+    model ``p[k+1] = a * p[k] + b`` the whole matrix comes from the closed
+    form ``p[k] = a**k * p[0] + b * (1 - a**k) / (1 - a)``; other models are
+    stepped forward with one batched ``predict`` per day.
+
+    Models trained on lagged features also need ``history``, the closes
+    before the starting price (oldest first), and ``start_date``, the date
+    of the starting price, so every step can rebuild the same features
+    ``train_model()`` used. Paths starting from different days pass one
+    history row and one date per starting price instead.
+    """
+    start = np.atleast_1d(np.asarray(start_prices, dtype=np.float64)).ravel()
+    if horizon <= 0:
+        return np.empty((len(start), 0))
+
+    pipeline = pipeline_for(model)
+    if not pipeline.is_legacy:
+        return _forecast_with_features(model, pipeline, start, horizon, history, start_date)
+
+    params = linear_params(model)
+    if params is not None:
+        a, b = params
+        steps = np.arange(1, horizon + 1)
+        powers = a ** steps
+        if np.isclose(a, 1.0):
+            drift = b * steps
+        else:
+            drift = b * (1 - powers) / (1 - a)
+        return np.multiply.outer(start, powers) + drift
+
+    paths = np.empty((len(start), horizon))
+    current = start
+    for k in range(horizon):
+        current = np.asarray(model.predict(current.reshape(-1, 1)), dtype=np.float64).ravel()
+        paths[:, k] = current
+    return paths
+
+
+def _forecast_with_features(model, pipeline, start, horizon, history, start_date, shocks=None, out=None):
+    """Step every path forward one business day at a time, updating features incrementally.
+
+    ``shocks``, if given, is added to each day's prediction before it feeds
+    the next day's features.
+    """
+    history = np.asarray([] if history is None else history, dtype=np.float64)
+    if history.shape[-1] < pipeline.window - 1:
+        raise ValueError(f"This model needs at least {pipeline.window - 1} closes of history")
+    if start_date is None and pipeline.calendar:
+        raise ValueError("This model needs the date of the starting price")
+    if start_date is not None:
+        # Day k of each path is k business days after its start (a weekend start rolls to Monday)
+        start_days = pd.DatetimeIndex(np.atleast_1d(start_date)).to_numpy(dtype="datetime64[D]")
+
+    # One row of recent closes per path, newest last
+    windows = np.empty((len(start), pipeline.window))
+    windows[:, :-1] = history[..., history.shape[-1] - pipeline.window + 1:]
+    windows[:, -1] = start
+
+    features = RollingFeatures(pipeline, windows, horizon)
+    paths = np.empty((len(start), horizon)) if out is None else out
+    for k in range(horizon):
+        dates = None if start_date is None else np.busday_offset(start_days, k, roll="forward")
+        paths[:, k] = np.asarray(model.predict(features.features(dates)), dtype=np.float64).ravel()
+        if shocks is not None:
+            paths[:, k] += shocks[:, k]
+        features.push(paths[:, k])
+    return paths
+
+
+def training_residuals(model, closes, dates=None, window=RESIDUAL_WINDOW):
+    """One-day-ahead errors of ``model`` over the last ``window`` days of ``closes``.
+
+    Only recent days are used so the errors are on the scale of today's
+    prices rather than the whole history's. They are centred so simulated
+    paths spread around the model's own forecast.
+    """
+    pipeline = pipeline_for(model)
+    keep = window + pipeline.window
+    closes = np.asarray(closes, dtype=np.float64)[-keep:]
+    dates = None if dates is None else np.asarray(dates)[-keep:]
+    X, y = pipeline.training_set(closes, dates)
+    errors = y - np.asarray(model.predict(X), dtype=np.float64).ravel()
+    return errors - errors.mean()
+
+
+def simulate_paths(model, start_price, horizon, residuals, n_paths=SIMULATED_PATHS, history=None,
+                   start_date=None, seed=0, out=None):
+    """Simulate ``n_paths`` price paths by adding bootstrapped residuals at every step.
+
+    Returns an ``(n_paths, horizon)`` array, written into ``out`` when a
+    buffer of that shape is given. For a one-feature linear model the noise
+    compounds as ``a**(k-j) * e[j]``, so all paths come from one matrix
+    product of the sampled residuals with a triangular matrix of powers of
+    ``a``; other models are stepped forward with every path in one batch.
+    """
+    residuals = np.asarray(residuals, dtype=np.float64).ravel()
+    if len(residuals) == 0:
+        raise ValueError("At least one residual is needed to simulate paths")
+    if out is None:
+        out = np.empty((n_paths, horizon))
+    elif out.shape != (n_paths, horizon):
+        raise ValueError(f"out must have shape {(n_paths, horizon)}")
+    if horizon <= 0:
+        return out
+
+    rng = np.random.default_rng(seed)
+    shocks = residuals[rng.integers(0, len(residuals), size=(n_paths, horizon))]
+
+    pipeline = pipeline_for(model)
+    params = linear_params(model) if pipeline.is_legacy else None
+    if params is not None:
+        a = params[0]
+        steps = np.arange(horizon)
+        lag = steps[None, :] - steps[:, None]
+        weights = np.where(lag >= 0, a ** np.maximum(lag, 0), 0.0)
+        np.matmul(shocks, weights, out=out)
+        out += forecast_paths(model, start_price, horizon)[0]
+        return out
+
+    start = np.full(n_paths, float(start_price))
+    if not pipeline.is_legacy:
+        return _forecast_with_features(model, pipeline, start, horizon, history, start_date, shocks, out)
+
+    current = start
+    for k in range(horizon):
+        current = np.asarray(model.predict(current.reshape(-1, 1)), dtype=np.float64).ravel() + shocks[:, k]
+        out[:, k] = current
+    return out
+
+
+def forecast_intervals(model, start_price, horizon, residuals, quantiles=INTERVAL_QUANTILES, **kwargs):
+    """Quantile bands of simulated paths, shape ``(len(quantiles), horizon)``.
+
+    Extra keyword arguments are passed to ``simulate_paths``.
+    """
+    paths = simulate_paths(model, start_price, horizon, residuals, **kwargs)
+    return np.percentile(paths, quantiles, axis=0)
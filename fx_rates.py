@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+
+# Currencies prices can be shown in; rates are units of the currency per USD
+CURRENCIES = ("USD", "INR", "AED", "EUR")
+
+# Approximate rates used when no FX history is available
+FALLBACK_RATES = {"USD": 1.0, "INR": 83.5, "AED": 3.6725, "EUR": 0.92}
+
+FX_DIR = "data"
+
+
+def fx_path(currency, directory=FX_DIR):
+    """Path of the store holding daily USD to ``currency`` rates, next to the gold prices"""
+    return os.path.join(directory, f"fx_usd_{currency.lower()}.bin")
+
+
+def check_currency(currency):
+    currency = str(currency).upper()
+    if currency not in FALLBACK_RATES:
+        raise ValueError(f"Unsupported currency {currency!r}, expected one of {', '.join(CURRENCIES)}")
+    return currency
+
+
+def yahoo_fx_source(currency, start="2010-01-01", end=None, timeout=10):
+    """Download daily USD to ``currency`` closes from Yahoo Finance (e.g. ``INR=X``)"""
+    import yfinance as yf
+
+    data = yf.download(f"{currency}=X", start=start, end=end, timeout=timeout)
+    return data[["Close"]].dropna()
+
+
+def download_fx(currency, source=yahoo_fx_source, directory=FX_DIR):
+    """Download the FX history for ``currency`` into its store; returns the number of rates.
+
+    ``source`` is any callable taking the currency code and returning a
+    date-indexed DataFrame with a ``Close`` column, so a local fixture can
+    stand in for Yahoo Finance.
+    """
+    from price_store import write_store
+
+    currency = check_currency(currency)
+    data = source(currency)
+    dates = data.index.to_numpy(dtype="datetime64[D]")
+    rates = np.asarray(data["Close"], dtype=np.float64).ravel()
+    valid = np.isfinite(rates) & (rates > 0)
+    return write_store(dates[valid], rates[valid], fx_path(currency, directory))
+
+
+def fx_version(currency, directory=FX_DIR):
+    """Identify the stored FX history for ``currency`` by mtime and size (None when absent)"""
+    try:
+        stat = os.stat(fx_path(currency, directory))
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_fx(currency, directory=FX_DIR):
+    """Stored rates for ``currency`` as a Date-indexed ``Close`` frame, or None"""
+    from price_store import open_store, records_to_frame
+
+    currency = check_currency(currency)
+    path = fx_path(currency, directory)
+    if currency == "USD" or not os.path.exists(path):
+        return None
+    return records_to_frame(open_store(path))
+
+
+def asof_rates(fx, dates, currency):
+    """Rate in effect on each of ``dates``: the last FX close on or before that date.
+
+    ``fx`` is a Date-indexed ``Close`` frame (or None). Dates before the
+    first FX close use that first close, and without any FX data every date
+    gets the fallback rate. The join is one binary search over the FX
+    dates, so the result can be applied to a price series as a single
+    vectorized multiply.
+    """
+    currency = check_currency(currency)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    if currency == "USD" or fx is None or len(fx) == 0:
+        return np.full(len(dates), FALLBACK_RATES[currency])
+    fx_dates = fx.index.to_numpy(dtype="datetime64[D]")
+    rates = np.asarray(fx["Close"], dtype=np.float64).ravel()
+    positions = np.searchsorted(fx_dates, dates, side="right") - 1
+    return rates[np.maximum(positions, 0)]
+
+
+def latest_rate(fx, currency):
+    """Most recent rate in ``fx``, or the fallback rate when there is none"""
+    currency = check_currency(currency)
+    if currency == "USD" or fx is None or len(fx) == 0:
+        return FALLBACK_RATES[currency]
+    return float(np.asarray(fx["Close"], dtype=np.float64).ravel()[-1])
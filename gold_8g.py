@@ -1,14 +1,13 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-# Gold weight in grams
-GOLD_WEIGHT = 8
-
-# USD to INR conversion rate (approximate)
-USD_TO_INR = 83.5
+from chart_cache import chart_cache
+from downsample import downsample_frame
+from gold_data import filter_dates, frame_version, get_gold_data, get_stats_index, trailing_slice, trailing_window
+from metrics import registry
+from price_store import has_prices
 
 # Page configuration
 st.set_page_config(page_title="8g Gold Price", page_icon="🟡", layout="wide")
@@ -39,7 +38,7 @@ st.markdown('<div class="title">🟡 8g Gold Price</div>', unsafe_allow_html=Tru
 st.markdown('<div class="subtitle">Current and historical prices for 8 grams of gold</div>', unsafe_allow_html=True)
 
 # Check if data exists, if not, create it
-if not os.path.exists("data/gold_data.csv"):
+if not has_prices():
     st.warning("No data found. Fetching gold price data...")
     try:
         from data_loader import fetch_data
@@ -51,34 +50,8 @@ if not os.path.exists("data/gold_data.csv"):
 
 # Load data
 try:
-    df = pd.read_csv("data/gold_data.csv")
-    
-    # Handle the CSV format
-    if "Price" in df.columns and "Close" in df.columns:
-        df = df.rename(columns={"Unnamed: 0": "Date"})
-    elif "Date" not in df.columns and len(df.columns) >= 2:
-        df = pd.read_csv("data/gold_data.csv", skiprows=3)
-        if len(df.columns) >= 2:
-            df.columns = ["Date", "Close"] + [f"Col{i}" for i in range(len(df.columns)-2)]
-    
-    # Ensure Date is datetime
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-        df.set_index("Date", inplace=True)
-    
-    # Ensure Close column is numeric
-    df["Close"] = pd.to_numeric(df["Close"], errors='coerce')
-    df.dropna(subset=["Close"], inplace=True)
-    
-    # Convert USD to INR
-    df["Close_INR"] = df["Close"] * USD_TO_INR
-    
-    # Calculate 8g gold price
-    # Note: Gold price is typically quoted per troy ounce (31.1035 grams)
-    TROY_OUNCE_TO_GRAM = 31.1035
-    df["8g_Gold_USD"] = df["Close"] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
-    df["8g_Gold_INR"] = df["Close_INR"] * (GOLD_WEIGHT / TROY_OUNCE_TO_GRAM)
-        
+    # Shared, read-only frame with the INR and 8g columns already computed
+    df = get_gold_data()
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
@@ -105,17 +78,19 @@ with col1:
     )
     
     # Filter data based on selected date range
-    mask = (df.index.date >= date_range[0]) & (df.index.date <= date_range[1])
-    filtered_df = df.loc[mask]
+    filtered_df = filter_dates(df, date_range[0], date_range[1])
     
-    # Plot
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(filtered_df.index, filtered_df["8g_Gold_INR"], color="#FFD700", linewidth=2.5)
-    ax.set_title("8g Gold Price Trend (INR)", fontsize=16)
-    ax.set_ylabel("Price (INR)")
-    ax.set_xlabel("Date")
-    ax.grid(True, alpha=0.3)
-    st.pyplot(fig)
+    # Plot at most one point per pixel, keeping the peaks and troughs
+    def draw_history(ax):
+        plot_df = downsample_frame(filtered_df, "8g_Gold_INR")
+        ax.plot(plot_df.index, plot_df["8g_Gold_INR"], color="#FFD700", linewidth=2.5)
+        ax.set_title("8g Gold Price Trend (INR)", fontsize=16)
+        ax.set_ylabel("Price (INR)")
+        ax.set_xlabel("Date")
+        ax.grid(True, alpha=0.3)
+    
+    # Rendered once per data version and date range
+    st.image(chart_cache.get_or_render((frame_version(), tuple(date_range), "8g_history"), draw_history))
 
 with col2:
     # Current price display
@@ -133,17 +108,18 @@ with col2:
     st.subheader("📈 Price Statistics (Last Year)")
     
     # Get last year's data
-    last_year = df[df.index >= (df.index.max() - timedelta(days=365))]
+    last_year = trailing_slice(df.index, 365)
+    stats = get_stats_index("8g_Gold_INR")
     
     stats_cols = st.columns(2)
     with stats_cols[0]:
-        st.metric("Average", f"₹{float(last_year['8g_Gold_INR'].mean()):.2f}")
-        st.metric("Minimum", f"₹{float(last_year['8g_Gold_INR'].min()):.2f}")
+        st.metric("Average", f"₹{stats.mean(last_year):.2f}")
+        st.metric("Minimum", f"₹{stats.min(last_year):.2f}")
     with stats_cols[1]:
-        st.metric("Maximum", f"₹{float(last_year['8g_Gold_INR'].max()):.2f}")
+        st.metric("Maximum", f"₹{stats.max(last_year):.2f}")
         
         # Calculate price change over the last month
-        last_month = df[df.index >= (df.index.max() - timedelta(days=30))]
+        last_month = trailing_window(df, 30)
         if len(last_month) > 1:
             change = last_month["8g_Gold_INR"].iloc[-1] - last_month["8g_Gold_INR"].iloc[0]
             change_percent = (change / last_month["8g_Gold_INR"].iloc[0]) * 100
@@ -160,5 +136,11 @@ recent_data.columns = ["Date", "8g Gold Price (INR)"]
 recent_data["8g Gold Price (INR)"] = recent_data["8g Gold Price (INR)"].map("₹{:.2f}".format)
 st.table(recent_data)
 
+# Stage timings and cache counters, shown with ?debug=1 or GOLD_DEBUG=1
+if os.environ.get("GOLD_DEBUG") == "1" or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🛠️ Debug: timings", expanded=True):
+        st.table(pd.DataFrame(registry.summary()))
+        st.table(pd.DataFrame(registry.cache_summary()))
+
 # Footer
 st.markdown('<div style="text-align: center; margin-top: 30px; color: gray;">Made with 💛 using Python & Streamlit</div>', unsafe_allow_html=True)
\ No newline at end of file
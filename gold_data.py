@@ -0,0 +1,141 @@
+import os
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from fx_rates import FALLBACK_RATES, asof_rates, fx_version, load_fx
+from metrics import record_cache, timer
+from price_stats import StatsIndex
+from price_store import CSV_PATH, STORE_PATH, load_prices
+
+# Gold is quoted per troy ounce (31.1035 grams)
+TROY_OUNCE_TO_GRAM = 31.1035
+
+# Gold weight in grams
+GOLD_WEIGHT = 8
+
+PRICE_COLUMNS = ["Close", "Close_INR", "8g_Gold_USD", "8g_Gold_INR"]
+
+_cache = {}
+_stats_cache = {}
+_lock = threading.Lock()
+
+
+def data_version(path=STORE_PATH, csv_path=CSV_PATH):
+    """Identify the current contents of the price data by file mtime and size"""
+    for candidate in (path, csv_path):
+        try:
+            stat = os.stat(candidate)
+        except FileNotFoundError:
+            continue
+        return (candidate, stat.st_mtime_ns, stat.st_size)
+    raise FileNotFoundError(f"No price data found at {path} or {csv_path}")
+
+
+def frame_version(path=STORE_PATH, csv_path=CSV_PATH):
+    """Version of the frame ``get_gold_data()`` returns: the price data plus the USD/INR rates"""
+    return (data_version(path, csv_path), fx_version("INR"))
+
+
+def build_gold_frame(close, index, usd_to_inr=None):
+    """Compute the derived price columns in one pass over a shared read-only block.
+
+    ``usd_to_inr`` is the rate for each row (or one rate for all rows);
+    without it the approximate fallback rate is used.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if usd_to_inr is None:
+        usd_to_inr = FALLBACK_RATES["INR"]
+    values = np.empty((len(close), len(PRICE_COLUMNS)))
+    values[:, 0] = close
+    np.multiply(close, usd_to_inr, out=values[:, 1])
+    np.multiply(close, GOLD_WEIGHT / TROY_OUNCE_TO_GRAM, out=values[:, 2])
+    np.multiply(values[:, 1], GOLD_WEIGHT / TROY_OUNCE_TO_GRAM, out=values[:, 3])
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=index, columns=PRICE_COLUMNS, copy=False)
+
+
+def get_gold_data(path=STORE_PATH, csv_path=CSV_PATH):
+    """Return gold prices with ``Close_INR``, ``8g_Gold_USD`` and ``8g_Gold_INR``.
+
+    INR prices use the stored USD/INR rate of each date. The frame is built
+    once per version of the price and FX files and shared by every caller
+    in the process, so it must be treated as read-only; its values are
+    backed by a non-writeable array. It is rebuilt automatically when
+    either file changes.
+    """
+    version = frame_version(path, csv_path)
+    entry = _cache.get(path)
+    if entry is not None and entry[0] == version:
+        record_cache("gold_frame", True)
+        return entry[1]
+
+    with _lock:
+        entry = _cache.get(path)
+        record_cache("gold_frame", entry is not None and entry[0] == version)
+        if entry is None or entry[0] != version:
+            with timer("parse"):
+                prices = load_prices(path, csv_path)
+            # Loading may have converted the CSV into the store
+            version = frame_version(path, csv_path)
+            with timer("transform"):
+                usd_to_inr = asof_rates(load_fx("INR"), prices.index, "INR")
+                entry = (version, build_gold_frame(prices["Close"].to_numpy(), prices.index, usd_to_inr))
+            _cache[path] = entry
+        return entry[1]
+
+
+def get_stats_index(column="8g_Gold_INR", path=STORE_PATH, csv_path=CSV_PATH):
+    """Return a StatsIndex over one column of the current gold data.
+
+    It is kept for as long as the data frame is, and extended rather than
+    rebuilt when the new version only appended rows. A new index is
+    published for each version, so callers still holding the previous one
+    are unaffected.
+    """
+    df = get_gold_data(path, csv_path)
+    key = (path, column)
+    entry = _stats_cache.get(key)
+    if entry is not None and entry[0] is df:
+        return entry[1]
+
+    with _lock:
+        entry = _stats_cache.get(key)
+        if entry is None or entry[0] is not df:
+            previous = entry[1] if entry is not None else StatsIndex()
+            with timer("stats"):
+                stats = previous.sync(df[column].to_numpy())
+            entry = (df, stats)
+            _stats_cache[key] = entry
+        return entry[1]
+
+
+def date_slice(index, start=None, end=None):
+    """Positional slice of a sorted DatetimeIndex covering ``start`` to ``end``.
+
+    Both bounds are inclusive calendar dates and either may be None. The
+    bounds are found by binary search, so the cost is O(log n) and no
+    per-row date objects are created.
+    """
+    lo = 0 if start is None else index.searchsorted(pd.Timestamp(start).normalize(), side="left")
+    hi = len(index) if end is None else index.searchsorted(pd.Timestamp(end).normalize() + timedelta(days=1), side="left")
+    return slice(int(lo), int(max(lo, hi)))
+
+
+def trailing_slice(index, days):
+    """Positional slice of the rows within ``days`` of the last timestamp"""
+    if len(index) == 0:
+        return slice(0, 0)
+    return slice(int(index.searchsorted(index[-1] - timedelta(days=days), side="left")), len(index))
+
+
+def filter_dates(df, start, end):
+    """Return the rows between ``start`` and ``end`` (inclusive dates) as a zero-copy slice"""
+    return df.iloc[date_slice(df.index, start, end)]
+
+
+def trailing_window(df, days):
+    """Return the rows within ``days`` of the latest date as a zero-copy slice"""
+    return df.iloc[trailing_slice(df.index, days)]
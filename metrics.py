@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Set GOLD_METRICS=0 to turn timing and counting off
+ENABLED = os.environ.get("GOLD_METRICS", "1") != "0"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds) with count, sum and max"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile ``q`` (the max for the overflow bucket)"""
+        if self.count == 0:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    """Context manager and decorator that records elapsed time for one stage"""
+
+    __slots__ = ("registry", "stage", "start")
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, func):
+        registry, stage = self.registry, self.stage
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(stage, time.perf_counter() - start)
+        return wrapper
+
+
+class MetricsRegistry:
+    """Per-process stage timings and cache hit/miss counters.
+
+    Time a block with ``with registry.timer("fetch"):`` or a function with
+    ``@registry.timer("predict")``; count cache lookups with
+    ``registry.cache("price", hit)``. Recording is a clock read plus a
+    bucket bisect under a lock, on the order of a microsecond.
+    """
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self.histograms = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage):
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def cache(self, name, hit):
+        """Count one lookup of cache ``name``"""
+        if not self.enabled:
+            return
+        key = (name, "hit" if hit else "miss")
+        with self._lock:
+            self.caches[key] = self.caches.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.caches.clear()
+
+    def summary(self):
+        """Rows of per-stage timings in milliseconds, for display"""
+        return [
+            {
+                "stage": stage,
+                "count": h.count,
+                "mean_ms": h.sum / h.count * 1000 if h.count else float("nan"),
+                "p50_ms": h.quantile(0.5) * 1000,
+                "p95_ms": h.quantile(0.95) * 1000,
+                "max_ms": h.max * 1000,
+            }
+            for stage, h in sorted(self.histograms.items())
+        ]
+
+    def cache_summary(self):
+        """Rows of hits, misses and hit rate per cache"""
+        names = sorted({name for name, _ in self.caches})
+        rows = []
+        for name in names:
+            hits = self.caches.get((name, "hit"), 0)
+            misses = self.caches.get((name, "miss"), 0)
+            rows.append({"cache": name, "hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)})
+        return rows
+
+    def render_prometheus(self, prefix="gold"):
+        """Current metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each processing stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, h in sorted(self.histograms.items()):
+            with h._lock:
+                counts, total, count = list(h.counts), h.sum, h.count
+            cumulative = 0
+            for bound, n in zip(h.buckets, counts):
+                cumulative += n
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_cache_requests_total Cache lookups by cache and result",
+            f"# TYPE {prefix}_cache_requests_total counter",
+        ]
+        with self._lock:
+            caches = sorted(self.caches.items())
+        for (name, result), n in caches:
+            lines.append(f'{prefix}_cache_requests_total{{cache="{name}",result="{result}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every module in the process
+registry = MetricsRegistry()
+timer = registry.timer
+record_cache = registry.cache
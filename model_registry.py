@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from metrics import record_cache
+
+MODEL_PATH = "model/model.pkl"
+PARAMS_PATH = "model/model.json"
+
+_cache = {}
+_lock = threading.Lock()
+
+
+class LinearParams:
+    """Linear model rebuilt from exported coefficients, usable without sklearn.
+
+    Exposes ``coef_``/``intercept_``, ``feature_config_`` and ``predict``
+    like the sklearn estimator it was exported from, so the forecasting
+    code treats both the same way.
+    """
+
+    def __init__(self, coef, intercept, metadata=None):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.metadata = metadata or {}
+        self.feature_config_ = self.metadata.get("feature_config")
+
+    @property
+    def n_features_in_(self):
+        return len(self.coef_)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    @classmethod
+    def load(cls, path=PARAMS_PATH):
+        with open(path) as f:
+            params = json.load(f)
+        return cls(params["coef"], params["intercept"], params.get("metadata"))
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export_params(model, path=PARAMS_PATH, model_path=MODEL_PATH, metadata=None):
+    """Write a linear model's coefficients and training metadata as JSON.
+
+    The hash of ``model_path`` is recorded so a stale parameter file is
+    never used for a newer pickle. Returns False for non-linear models.
+    """
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None:
+        return False
+
+    metadata = dict(metadata or {})
+    metadata.setdefault("model_type", type(model).__name__)
+    if getattr(model, "feature_config_", None) is not None:
+        metadata.setdefault("feature_config", model.feature_config_)
+    metadata.setdefault("exported_at", datetime.now().isoformat(timespec="seconds"))
+    params = {
+        "coef": np.ravel(coef).tolist(),
+        "intercept": float(np.ravel(intercept)[0]),
+        "model_sha256": file_sha256(model_path),
+        "metadata": metadata,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(params, f, indent=2)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _params_for(model_hash, params_path):
+    """Load the parameter file if it was exported from the model with ``model_hash``"""
+    try:
+        with open(params_path) as f:
+            params = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if params.get("model_sha256") != model_hash:
+        return None
+    return LinearParams(params["coef"], params["intercept"], params.get("metadata"))
+
+
+def load_model(path=MODEL_PATH, params_path=PARAMS_PATH):
+    """Return the model at ``path``, cached per process.
+
+    The cache is keyed on the file's mtime and size; when those change the
+    file is re-hashed and only reloaded if its contents differ. Linear
+    models are served from the exported parameter file, so sklearn is only
+    imported when no up-to-date parameters exist.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    entry = _cache.get(path)
+    if entry is not None and entry["stamp"] == stamp:
+        record_cache("model", True)
+        return entry["model"]
+
+    with _lock:
+        entry = _cache.get(path)
+        if entry is not None and entry["stamp"] == stamp:
+            record_cache("model", True)
+            return entry["model"]
+
+        model_hash = file_sha256(path)
+        if entry is not None and entry["sha256"] == model_hash:
+            # Touched but unchanged
+            entry["stamp"] = stamp
+            record_cache("model", True)
+            return entry["model"]
+        record_cache("model", False)
+
+        model = _params_for(model_hash, params_path)
+        if model is None:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+            try:
+                export_params(model, params_path, path)
+            except OSError as e:
+                print(f"Could not export model parameters to {params_path}: {e}")
+
+        _cache[path] = {"stamp": stamp, "sha256": model_hash, "model": model}
+        return model
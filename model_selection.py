@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from backtest import walk_forward_folds
+from features import FeaturePipeline
+from model_registry import MODEL_PATH, PARAMS_PATH, LinearParams, export_params
+from price_store import load_prices
+
+CACHE_DIR = "model/cv_cache"
+SELECTION_PATH = "model/model_selection.json"
+
+FEATURE_CONFIGS = [
+    {"lags": 1, "windows": [], "calendar": False},
+    {"lags": 5, "windows": [5, 20], "calendar": True},
+    {"lags": 10, "windows": [5, 20], "calendar": True},
+    {"lags": 20, "windows": [5, 20, 60], "calendar": True},
+]
+
+MODEL_SPECS = [
+    {"family": "linear"},
+    *({"family": "ridge", "alpha": alpha} for alpha in (0.1, 1.0, 10.0, 100.0)),
+    *({"family": "lasso", "alpha": alpha} for alpha in (0.01, 0.1, 1.0)),
+    {"family": "gradient_boosting", "n_estimators": 200, "max_depth": 3, "learning_rate": 0.05},
+]
+
+LINEAR_FAMILIES = ("linear", "ridge", "lasso")
+
+
+def build_estimator(spec):
+    """Create an unfitted estimator for a model spec"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.linear_model import Lasso, LinearRegression, Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    family = spec["family"]
+    if family == "linear":
+        return LinearRegression()
+    if family == "ridge":
+        return make_pipeline(StandardScaler(), Ridge(alpha=spec["alpha"]))
+    if family == "lasso":
+        return make_pipeline(StandardScaler(), Lasso(alpha=spec["alpha"], max_iter=50_000))
+    if family == "gradient_boosting":
+        params = {key: value for key, value in spec.items() if key != "family"}
+        return GradientBoostingRegressor(random_state=0, **params)
+    raise ValueError(f"Unknown model family {family!r}")
+
+
+def to_linear_params(estimator):
+    """Fold a fitted (scaler +) linear estimator into plain LinearParams"""
+    if hasattr(estimator, "steps"):
+        scaler, linear = estimator[0], estimator[-1]
+        coef = linear.coef_ / scaler.scale_
+        intercept = linear.intercept_ - coef @ scaler.mean_
+    else:
+        coef, intercept = estimator.coef_, estimator.intercept_
+    return LinearParams(coef, float(intercept))
+
+
+def data_hash(closes, dates):
+    digest = hashlib.sha256(np.ascontiguousarray(closes, dtype=np.float64).tobytes())
+    digest.update(np.asarray(dates, dtype="datetime64[D]").astype(np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(data_digest, feature_config, spec, fold):
+    payload = json.dumps([data_digest, feature_config, spec, list(fold)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def score_fold(X, y, fold, spec):
+    """Fit on the fold's training rows and score next-day predictions on its test rows"""
+    estimator = build_estimator(spec)
+    estimator.fit(X[fold.train_start:fold.train_end], y[fold.train_start:fold.train_end])
+    predicted = estimator.predict(X[fold.test_start:fold.test_end])
+    errors = predicted - y[fold.test_start:fold.test_end]
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors ** 2).mean())),
+        "mape": float((np.abs(errors) / np.abs(y[fold.test_start:fold.test_end])).mean() * 100),
+    }
+
+
+def _cached_score(X, y, fold, spec, path):
+    """Score a fold, reusing the result on disk when this exact combination ran before"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    result = score_fold(X, y, fold, spec)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+    return result
+
+
+def select_model(closes, dates, feature_configs=FEATURE_CONFIGS, model_specs=MODEL_SPECS,
+                 n_folds=5, n_jobs=-1, cache_dir=CACHE_DIR):
+    """Cross-validate every feature config / model spec pair over time-series folds.
+
+    Folds run in parallel with joblib, and each (data, features, model,
+    fold) result is cached as JSON under ``cache_dir`` so reruns only
+    compute new combinations. Returns the leaderboard sorted by mean RMSE.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = data_hash(closes, dates)
+
+    # Score every config on the same target days so the numbers are comparable
+    longest = max(FeaturePipeline.from_config(config).window for config in feature_configs)
+    n_rows = len(closes) - longest
+    folds = walk_forward_folds(n_rows, n_folds)
+
+    tasks, keys = [], []
+    for config in feature_configs:
+        X, y = FeaturePipeline.from_config(config).training_set(closes, dates)
+        X, y = X[-n_rows:], y[-n_rows:]
+        for spec in model_specs:
+            for fold in folds:
+                path = os.path.join(cache_dir, cache_key(digest, config, spec, fold) + ".json")
+                tasks.append(delayed(_cached_score)(X, y, fold, spec, path))
+                keys.append((json.dumps(config, sort_keys=True), json.dumps(spec, sort_keys=True)))
+
+    results = Parallel(n_jobs=n_jobs)(tasks)
+
+    scores = {}
+    for key, result in zip(keys, results):
+        scores.setdefault(key, []).append(result)
+    leaderboard = [
+        {
+            "feature_config": json.loads(config),
+            "model": json.loads(spec),
+            **{metric: float(np.mean([fold[metric] for fold in folds_scored])) for metric in ("mae", "rmse", "mape")},
+        }
+        for (config, spec), folds_scored in scores.items()
+    ]
+    return sorted(leaderboard, key=lambda row: row["rmse"])
+
+
+def save_winner(closes, dates, winner, leaderboard, model_path=MODEL_PATH, params_path=PARAMS_PATH,
+                selection_path=SELECTION_PATH):
+    """Refit the best combination on all data and write it with its selection metadata"""
+    pipeline = FeaturePipeline.from_config(winner["feature_config"])
+    X, y = pipeline.training_set(closes, dates)
+    estimator = build_estimator(winner["model"])
+    estimator.fit(X, y)
+
+    metadata = {
+        "feature_config": pipeline.to_config(),
+        "features": pipeline.names,
+        "model_spec": winner["model"],
+        "cv_rmse": winner["rmse"],
+        "train_rows": len(y),
+        "last_date": str(np.asarray(dates, dtype="datetime64[D]")[-1]),
+    }
+    if winner["model"]["family"] in LINEAR_FAMILIES:
+        model = to_linear_params(estimator)
+        model.metadata = metadata
+    else:
+        model = estimator
+    model.feature_config_ = pipeline.to_config()
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    if not export_params(model, params_path, model_path, metadata=metadata) and os.path.exists(params_path):
+        # A stale parameter file would never match the new pickle's hash, but don't leave it around
+        os.remove(params_path)
+
+    with open(selection_path, "w") as f:
+        json.dump({
+            "selected_at": datetime.now().isoformat(timespec="seconds"),
+            "winner": winner,
+            "leaderboard": leaderboard,
+        }, f, indent=2)
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Select the gold price model by time-series cross-validation")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel workers (-1 uses all cores)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the leaderboard")
+    args = parser.parse_args()
+
+    df = load_prices()
+    closes, dates = df["Close"].to_numpy(), df.index.to_numpy()
+    leaderboard = select_model(closes, dates, n_folds=args.folds, n_jobs=args.jobs)
+
+    print(f"{'rmse':>9} {'mae':>9} {'mape %':>7}  features / model")
+    for row in leaderboard:
+        print(f"{row['rmse']:9.3f} {row['mae']:9.3f} {row['mape']:7.3f}  {row['feature_config']} {row['model']}")
+
+    if not args.dry_run:
+        save_winner(closes, dates, leaderboard[0], leaderboard)
+        print(f"\nSaved {leaderboard[0]['model']} with {leaderboard[0]['feature_config']} to {MODEL_PATH}")
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import pickle
+
+import numpy as np
+
+from features import DEFAULT_CONFIG, FeaturePipeline
+from model_registry import MODEL_PATH, PARAMS_PATH, LinearParams, export_params
+from price_store import load_prices
+
+STATE_PATH = "model/online_state.npz"
+
+
+class OnlineLinearModel:
+    """Linear regression kept as sufficient statistics so it can be updated in place.
+
+    Holds ``XᵀX`` and ``Xᵀy`` (with an intercept column) over every feature
+    row seen so far, plus the last ``window`` closes needed to build features
+    for the next days. Appending ``m`` days costs O(m) regardless of how
+    much history is behind it. With ``forgetting < 1`` older rows are
+    down-weighted by ``forgetting ** age`` so recent regimes count more.
+    """
+
+    def __init__(self, feature_config=None, forgetting=1.0):
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.pipeline = FeaturePipeline.from_config(feature_config or DEFAULT_CONFIG)
+        self.forgetting = float(forgetting)
+        k = len(self.pipeline.names) + 1
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.weight = 0.0
+        self.rows = 0
+        self.tail_closes = np.empty(0)
+        self.tail_dates = np.empty(0, dtype="datetime64[D]")
+
+    @property
+    def last_date(self):
+        return self.tail_dates[-1] if len(self.tail_dates) else None
+
+    def update(self, closes, dates):
+        """Fold in closes for days after ``last_date``; returns the number of rows added"""
+        closes = np.asarray(closes, dtype=np.float64)
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if self.last_date is not None:
+            newer = dates > self.last_date
+            closes, dates = closes[newer], dates[newer]
+        if len(closes) == 0:
+            return 0
+
+        # The last stored day was still waiting for its target (the next close)
+        all_closes = np.concatenate([self.tail_closes, closes])
+        all_dates = np.concatenate([self.tail_dates, dates])
+        X, first = self.pipeline.transform(all_closes, all_dates, start=max(len(self.tail_closes) - 1, 0))
+        X, y = X[:-1], all_closes[first + 1:]
+
+        if len(y):
+            X = np.column_stack([X, np.ones(len(X))])
+            decay = self.forgetting ** np.arange(len(y) - 1, -1, -1)
+            scale = self.forgetting ** len(y)
+            self.xtx = scale * self.xtx + (X * decay[:, None]).T @ X
+            self.xty = scale * self.xty + (X * decay[:, None]).T @ y
+            self.weight = scale * self.weight + decay.sum()
+            self.rows += len(y)
+
+        keep = self.pipeline.window
+        self.tail_closes = all_closes[-keep:]
+        self.tail_dates = all_dates[-keep:]
+        return len(y)
+
+    def solve(self):
+        """Return the current fit as ``LinearParams``"""
+        if self.rows == 0:
+            raise ValueError("No training rows yet")
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return LinearParams(beta[:-1], beta[-1], {
+            "feature_config": self.pipeline.to_config(),
+            "features": self.pipeline.names,
+            "train_rows": self.rows,
+            "forgetting": self.forgetting,
+            "last_date": str(self.last_date),
+        })
+
+    def save(self, path=STATE_PATH):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, xtx=self.xtx, xty=self.xty, weight=self.weight, rows=self.rows,
+                 tail_closes=self.tail_closes, tail_dates=self.tail_dates.astype(np.int64),
+                 forgetting=self.forgetting, feature_config=json.dumps(self.pipeline.to_config()))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        with np.load(path) as state:
+            model = cls(json.loads(str(state["feature_config"])), float(state["forgetting"]))
+            model.xtx = state["xtx"]
+            model.xty = state["xty"]
+            model.weight = float(state["weight"])
+            model.rows = int(state["rows"])
+            model.tail_closes = state["tail_closes"]
+            model.tail_dates = state["tail_dates"].astype("datetime64[D]")
+        return model
+
+
+def update_model(state_path=STATE_PATH, model_path=MODEL_PATH, params_path=PARAMS_PATH,
+                 feature_config=None, forgetting=1.0):
+    """Fold newly stored days into the online model and persist it.
+
+    The first run builds the statistics from the full history; later runs
+    only read the days after the last one seen.
+    """
+    if os.path.exists(state_path):
+        online = OnlineLinearModel.load(state_path)
+    else:
+        online = OnlineLinearModel(feature_config, forgetting)
+
+    df = load_prices()
+    if online.last_date is not None:
+        df = df.iloc[df.index.searchsorted(np.datetime64(online.last_date, "ns"), side="right"):]
+    added = online.update(df["Close"].to_numpy(), df.index.to_numpy())
+    if added == 0 and os.path.exists(model_path):
+        print("No new rows, model unchanged")
+        return 0
+
+    model = online.solve()
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    export_params(model, params_path, model_path, metadata=model.metadata)
+    online.save(state_path)
+    print(f"Added {added} rows ({online.rows} total) and saved the model to {model_path}")
+    return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the gold price model with newly stored days")
+    parser.add_argument("--forgetting", type=float, default=1.0,
+                        help="per-day weight decay for a new model, e.g. 0.999 (1 keeps all history equal)")
+    args = parser.parse_args()
+    update_model(forgetting=args.forgetting)
@@ -0,0 +1,162 @@
+import threading
+import time
+from datetime import timedelta
+
+from metrics import record_cache
+
+
+class PriceCache:
+    """Process-wide cache of gold closes with a TTL and incremental refresh.
+
+    The first call backfills the full history through ``fetcher``. Once the
+    TTL has expired, only rows newer than the last cached date are fetched
+    and appended. While one thread is refreshing, other threads get the
+    cached frame instead of starting their own download.
+
+    With ``background=True`` the refresh runs in a daemon thread instead,
+    so requests never wait on the network once data has been loaded: stale
+    data is served while it revalidates. A refresh still running after
+    ``timeout`` seconds is abandoned (its result is discarded) and the next
+    request starts a new one. Before the first backfill completes, callers
+    wait at most ``timeout`` seconds and may get None. After a failed
+    download with nothing cached, callers get None without a new download
+    for ``retry`` seconds, so an upstream outage isn't hammered.
+
+    ``fetcher`` is any callable taking an optional ``start`` date and
+    returning a DataFrame indexed by date with a ``Close`` column (or None on
+    failure), so tests can plug in a local fake data source. ``name`` labels
+    its hit/miss counts in the metrics.
+    """
+
+    def __init__(self, fetcher, ttl=900, clock=time.monotonic, background=False, timeout=30, name="price",
+                 retry=30):
+        self.fetcher = fetcher
+        self.name = name
+        self.ttl = ttl
+        self.retry = retry
+        self.clock = clock
+        self.background = background
+        self.timeout = timeout
+        self.version = 0
+        self._data = None
+        self._fetched_at = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+        # Background refresh state, guarded by _state_lock
+        self._state_lock = threading.Lock()
+        self._generation = 0
+        self._refresh_thread = None
+        self._refresh_started = None
+
+    def is_stale(self):
+        return self._fetched_at is None or self.clock() - self._fetched_at >= self.ttl
+
+    def _backing_off(self):
+        """True for ``retry`` seconds after a download failed while nothing was cached"""
+        failed_at = self._failed_at
+        return self._data is None and failed_at is not None and self.clock() - failed_at < self.retry
+
+    def get(self, wait=True):
+        """Return the cached frame, refreshing it first if the TTL has expired.
+
+        With background refresh and ``wait=False``, returns None right away
+        instead of waiting for the first backfill.
+        """
+        data = self._data
+        if data is not None and not self.is_stale():
+            record_cache(self.name, True)
+            return data
+        record_cache(self.name, False)
+        if self._backing_off():
+            return None
+
+        if self.background:
+            self.refresh_async()
+            if data is None and wait:
+                # Nothing to serve yet, so wait for the backfill but not past the timeout
+                self._ready.wait(self.timeout)
+            return self._data
+
+        if data is None:
+            # Nothing to serve yet, so wait for whoever is backfilling
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            # A refresh is already running: serve the cached frame
+            return data
+
+        try:
+            if (self._data is None or self.is_stale()) and not self._backing_off():
+                self.refresh()
+        finally:
+            self._lock.release()
+        return self._data
+
+    def refresh(self):
+        """Backfill on first use, afterwards fetch and append only newer rows"""
+        self._store(self._updated(self._data))
+
+    def refresh_async(self):
+        """Start a background refresh unless one started less than ``timeout`` seconds ago"""
+        with self._state_lock:
+            running = self._refresh_thread
+            if running is not None and running.is_alive() and self.clock() - self._refresh_started < self.timeout:
+                return running
+            self._generation += 1
+            thread = threading.Thread(target=self._background_refresh, args=(self._generation,),
+                                      name="price-cache-refresh", daemon=True)
+            self._refresh_thread = thread
+            self._refresh_started = self.clock()
+            thread.start()
+            return thread
+
+    def _background_refresh(self, generation):
+        try:
+            data = self._updated(self._data)
+        except Exception as e:
+            print(f"Error refreshing prices: {e}")
+            data = self._data
+        with self._state_lock:
+            # A refresh that outlived its timeout has been replaced by a newer one
+            if generation == self._generation:
+                self._store(data)
+
+    def _updated(self, data):
+        """Return ``data`` with newer rows appended, or the full history when there is none yet"""
+        import pandas as pd
+
+        if data is None:
+            new = self.fetcher()
+            if new is not None and not new.empty:
+                return new.sort_index()
+            return None
+
+        last_date = data.index[-1]
+        new = self.fetcher(start=(last_date + timedelta(days=1)).strftime("%Y-%m-%d"))
+        if new is not None and not new.empty:
+            new = new[new.index > last_date]
+            if len(new):
+                return pd.concat([data, new.sort_index()])
+        return data
+
+    def _store(self, data):
+        if data is not self._data:
+            self._data = data
+            self.version += 1
+
+        # Failed refreshes also wait a full TTL so a flaky upstream isn't
+        # hammered; a failed first download is retried after ``retry`` seconds
+        if self._data is not None:
+            self._fetched_at = self.clock()
+            self._ready.set()
+        else:
+            self._failed_at = self.clock()
+
+    def clear(self):
+        with self._lock, self._state_lock:
+            self._generation += 1
+            self._data = None
+            self._fetched_at = None
+            self._failed_at = None
+            self._ready.clear()
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+class StatsIndex:
+    """Range mean/min/max over a price series in O(1) per query.
+
+    Means come from a prefix-sum array and minima/maxima from sparse tables
+    (level ``k`` holds the min/max of every window of length ``2**k``), so
+    any range is answered with two overlapping table lookups. Appending
+    rows only computes the prefix sums and table entries that involve the
+    new rows; existing entries are kept as they are.
+
+    An index shared between threads must not be extended in place; use
+    ``sync()``, which leaves it untouched and returns a new one.
+    """
+
+    def __init__(self, values=()):
+        self.values = np.empty(0)
+        self.prefix = np.zeros(1)
+        self.mins = []
+        self.maxs = []
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def extend(self, values):
+        """Append new values to the end of the series"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        old_n = len(self.values)
+        self.values = np.concatenate([self.values, values])
+        n = len(self.values)
+        self.prefix = np.concatenate([self.prefix, self.prefix[-1] + np.cumsum(values)])
+
+        # Level 0 is the series itself
+        self.mins[0:1] = [self.values]
+        self.maxs[0:1] = [self.values]
+
+        k = 1
+        while (1 << k) <= n:
+            half = 1 << (k - 1)
+            size = n - (1 << k) + 1
+            if k < len(self.mins):
+                # Only windows that reach into the new rows need computing
+                start = max(0, old_n - (1 << k) + 1)
+                prev_min, prev_max = self.mins[k], self.maxs[k]
+            else:
+                start = 0
+                prev_min, prev_max = np.empty(0), np.empty(0)
+            lower, upper = self.mins[k - 1], self.maxs[k - 1]
+            new_min = np.minimum(lower[start:size], lower[start + half:size + half])
+            new_max = np.maximum(upper[start:size], upper[start + half:size + half])
+            self.mins[k:k + 1] = [np.concatenate([prev_min[:start], new_min])]
+            self.maxs[k:k + 1] = [np.concatenate([prev_max[:start], new_max])]
+            k += 1
+
+    def sync(self, values):
+        """Return an index over ``values``, reusing this one's tables when ``values`` only appends rows.
+
+        Any change to the rows already indexed (e.g. a revised bar) means a
+        full rebuild. This index is never modified, so readers holding it
+        keep seeing a consistent series.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(self.values)
+        if len(values) < n or not np.array_equal(values[:n], self.values):
+            return StatsIndex(values)
+        if len(values) == n:
+            return self
+        stats = StatsIndex.__new__(StatsIndex)
+        stats.values, stats.prefix = self.values, self.prefix
+        stats.mins, stats.maxs = list(self.mins), list(self.maxs)
+        stats.extend(values[n:])
+        return stats
+
+    def _bounds(self, sl):
+        start, stop, _ = sl.indices(len(self.values))
+        return start, max(start, stop)
+
+    def mean(self, sl=slice(None)):
+        start, stop = self._bounds(sl)
+        if stop == start:
+            return float("nan")
+        return float((self.prefix[stop] - self.prefix[start]) / (stop - start))
+
+    def _query(self, tables, func, sl):
+        start, stop = self._bounds(sl)
+        if stop == start:
+            return float("nan")
+        k = (stop - start).bit_length() - 1
+        table = tables[k]
+        return float(func(table[start], table[stop - (1 << k)]))
+
+    def min(self, sl=slice(None)):
+        return self._query(self.mins, min, sl)
+
+    def max(self, sl=slice(None)):
+        return self._query(self.maxs, max, sl)
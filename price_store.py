@@ -0,0 +1,157 @@
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+STORE_PATH = "data/gold_data.bin"
+CSV_PATH = "data/gold_data.csv"
+
+# File layout: a fixed 64-byte header followed by `count` packed records.
+# Each record is a day number (datetime64[D]) and a float64 close, so the
+# whole file can be memory-mapped and sliced without parsing anything.
+MAGIC = b"GOLDPX\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIqq")
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([("date", "<M8[D]"), ("close", "<f8")])
+
+NAT_DAYS = np.iinfo(np.int64).min
+
+StoreHeader = namedtuple("StoreHeader", ["version", "count", "last_date"])
+
+
+def pack_header(count, last_date):
+    """Encode a store header; ``last_date`` is a datetime64[D] or None"""
+    last_days = NAT_DAYS if last_date is None else int(np.datetime64(last_date, "D").astype(np.int64))
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, last_days).ljust(HEADER_SIZE, b"\x00")
+
+
+def read_header(path=STORE_PATH):
+    """Read the header of a price store without touching the records"""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path} is too short to be a price store")
+    magic, version, _, count, last_days = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a price store")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported price store version {version} in {path}")
+    last_date = None if last_days == NAT_DAYS else np.datetime64(last_days, "D")
+    return StoreHeader(version, count, last_date)
+
+
+def to_records(dates, closes):
+    """Pack dates and closes into a sorted, de-duplicated record array"""
+    records = np.empty(len(closes), dtype=RECORD_DTYPE)
+    records["date"] = np.asarray(dates, dtype="datetime64[D]")
+    records["close"] = np.asarray(closes, dtype=np.float64)
+    records = records[~np.isnan(records["close"]) & ~np.isnat(records["date"])]
+
+    # Keep the last value seen for each date
+    records = records[::-1]
+    _, first = np.unique(records["date"], return_index=True)
+    return records[first]
+
+
+def write_store(dates, closes, path=STORE_PATH):
+    """Write a complete store atomically (temp file + rename)"""
+    records = to_records(dates, closes)
+    last_date = records["date"][-1] if len(records) else None
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pack_header(len(records), last_date))
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def open_store(path=STORE_PATH):
+    """Memory-map the records of a store (read-only)"""
+    header = read_header(path)
+    if header.count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(header.count,))
+
+
+def records_to_frame(records):
+    """Turn store records into the Date-indexed ``Close`` frame the apps use"""
+    index = pd.DatetimeIndex(records["date"].astype("datetime64[ns]"), name="Date")
+    return pd.DataFrame({"Close": np.array(records["close"], dtype=np.float64)}, index=index)
+
+
+def read_csv_prices(path=CSV_PATH):
+    """Parse a gold price CSV, either yfinance's 3-header-row layout or plain Date,Close"""
+    df = pd.read_csv(path)
+    if "Date" in df.columns and "Close" in df.columns:
+        dates, closes = df["Date"], df["Close"]
+    else:
+        # yfinance layout: "Price,Close" / "Ticker,GC=F" / "Date," then the rows
+        df = pd.read_csv(path, skiprows=3, header=None)
+        dates, closes = df.iloc[:, 0], df.iloc[:, 1]
+    dates = pd.to_datetime(dates, errors="coerce").to_numpy(dtype="datetime64[D]")
+    closes = pd.to_numeric(closes, errors="coerce").to_numpy(dtype=np.float64)
+    return dates, closes
+
+
+def convert_csv(csv_path=CSV_PATH, path=STORE_PATH):
+    """Convert a legacy CSV into a binary price store"""
+    dates, closes = read_csv_prices(csv_path)
+    return write_store(dates, closes, path)
+
+
+def has_prices(path=STORE_PATH, csv_path=CSV_PATH):
+    return os.path.exists(path) or os.path.exists(csv_path)
+
+
+def load_prices(path=STORE_PATH, csv_path=CSV_PATH):
+    """Load gold closes as a Date-indexed DataFrame with a ``Close`` column.
+
+    The legacy CSV is converted to the binary store on first use. If the
+    store cannot be written (e.g. a read-only deployment) the CSV is parsed
+    directly instead.
+    """
+    if not os.path.exists(path):
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No price data found at {path} or {csv_path}")
+        try:
+            convert_csv(csv_path, path)
+        except OSError as e:
+            print(f"Could not write price store {path}: {e}")
+            return records_to_frame(to_records(*read_csv_prices(csv_path)))
+    return records_to_frame(open_store(path))
+
+
+def append_store(dates, closes, path=STORE_PATH):
+    """Append records newer than the store's last date.
+
+    The records are written and synced past the current row count before
+    the header is rewritten, so a crash at any point leaves either the old
+    or the new store: readers only ever look at ``count`` rows, and any
+    torn tail is truncated by the next append.
+    """
+    header = read_header(path)
+    records = to_records(dates, closes)
+    if header.last_date is not None:
+        records = records[records["date"] > header.last_date]
+    if len(records) == 0:
+        return 0
+
+    count = header.count + len(records)
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + header.count * RECORD_DTYPE.itemsize)
+        f.truncate()
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(pack_header(count, records["date"][-1]))
+        f.flush()
+        os.fsync(f.fileno())
+    return len(records)
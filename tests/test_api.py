@@ -0,0 +1,133 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import index
+from price_cache import PriceCache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client with the price and FX upstreams replaced by local frames"""
+    dates = pd.bdate_range(end="2024-12-31", periods=500, name="Date")
+    prices = pd.DataFrame({"Close": np.linspace(1800, 2600, len(dates))}, index=dates)
+    monkeypatch.setattr(index, "price_cache", PriceCache(lambda start=None: prices if start is None else None))
+    monkeypatch.setattr(index, "fx_caches", {currency: PriceCache(lambda start=None: None) for currency in index.fx_caches})
+    index._snapshots.clear()
+    index._ounce_series.clear()
+    return index.app.test_client()
+
+
+@pytest.mark.parametrize("body", [
+    [2300, 2400],
+    "2300",
+    {"prices": [[2300, 2400], [2500, 2600]]},
+    {"prices": 2300},
+    {"prices": [2300], "horizon": 1.7},
+    {"prices": [2300], "horizon": [[1]]},
+    {"prices": [2300, 2400], "horizon": [1, 2, 3]},
+    {"prices": [2300], "horizon": 0},
+    {"prices": [2300] * 4097},
+    {"prices": [2300] * 4000, "horizon": 365},
+])
+def test_predict_rejects_malformed_input(client, body):
+    assert client.post("/api/predict", json=body).status_code == 400
+
+
+def test_predict_horizon_per_price(client):
+    response = client.post("/api/predict", json={"prices": [2300, 2400], "horizon": [1, 3]})
+    assert response.status_code == 200
+    assert [len(p) for p in response.get_json()["predictions"]] == [1, 3]
+
+
+@pytest.mark.parametrize("body", [
+    {"prices": [2300], "intervals": "false"},
+    {"prices": [2300], "intervals": 1},
+    {"prices": [2300] * 11, "intervals": True},
+    {"prices": [2300, 2400], "horizon": 200, "intervals": True},
+])
+def test_predict_rejects_bad_interval_requests(client, body):
+    assert client.post("/api/predict", json=body).status_code == 400
+
+
+def test_predict_intervals(client):
+    response = client.post("/api/predict", json={"prices": [2300], "horizon": 5, "intervals": True})
+    assert response.status_code == 200
+    bands = response.get_json()["intervals"][0]
+    assert sorted(bands) == ["p5", "p50", "p95"] and all(len(b) == 5 for b in bands.values())
+    assert client.post("/api/predict", json={"prices": [2300], "intervals": False}).get_json().get("intervals") is None
+
+
+def test_interval_buffer_grows_with_the_horizon(client, monkeypatch):
+    from forecast import SIMULATED_PATHS
+
+    monkeypatch.setattr(index, "_path_buffers", threading.local())
+    for horizon, size in [(5, 5), (30, 30), (10, 30)]:
+        response = client.post("/api/predict", json={"prices": [2300, 2400], "horizon": [horizon, 2], "intervals": True})
+        assert [len(b["p50"]) for b in response.get_json()["intervals"]] == [horizon, 2]
+        assert index._path_buffers.paths.shape == (SIMULATED_PATHS * size,)
+
+
+def test_concurrent_requests_while_rows_are_appended(monkeypatch):
+    dates = pd.bdate_range(end="2024-12-31", periods=4000, name="Date")
+    history = pd.DataFrame({"Close": np.linspace(1200, 2600, len(dates))}, index=dates)
+
+    def fetch(start=None):
+        # Every refresh appends one day, so the stats are extended while other threads read them
+        if start is None:
+            return history
+        return pd.DataFrame({"Close": [2600.0]}, index=[pd.Timestamp(start)])
+
+    monkeypatch.setattr(index, "price_cache", PriceCache(fetch, ttl=0))
+    monkeypatch.setattr(index, "fx_caches", {currency: PriceCache(lambda start=None: None) for currency in index.fx_caches})
+    index._snapshots.clear()
+    index._ounce_series.clear()
+
+    statuses = []
+
+    def client():
+        http = index.app.test_client()
+        statuses.extend(http.get("/api/gold-price").status_code for _ in range(150))
+
+    # Switch threads as often as possible so reads interleave with updates
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+    assert statuses == [200] * 600
+
+
+def test_ounce_series_publishes_new_stats_on_append():
+    dates = pd.bdate_range(end="2024-12-31", periods=300, name="Date")
+    df = pd.DataFrame({"Close": np.linspace(1800, 2000, len(dates))}, index=dates)
+    grown = pd.concat([df, pd.DataFrame({"Close": [5000.0]}, index=[pd.Timestamp("2025-01-01")])])
+    index._ounce_series.clear()
+
+    prices, stats = index.get_ounce_series(df, None, "USD")
+    new_prices, new_stats = index.get_ounce_series(grown, None, "USD")
+
+    # Readers still holding the old pair keep a consistent view
+    assert len(stats) == len(prices) == 300 and stats.max() == 2000.0
+    assert len(new_stats) == len(new_prices) == 301 and new_stats.max() == 5000.0
+
+
+@pytest.mark.parametrize("query", ["weight=1e308&unit=oz", "weight=inf", "weight=-1", "weight=abc", "unit=kg",
+                                   "currency=GBP", "weight=40000&unit=oz"])
+def test_gold_price_rejects_bad_projection(client, query):
+    assert client.get(f"/api/gold-price?{query}").status_code == 400
+
+
+def test_gold_price_projection(client):
+    body = client.get("/api/gold-price?weight=1&unit=oz&currency=USD").get_json()
+    assert body["unit"] == "oz" and body["currency"] == "USD"
+    assert body["current_price_usd"] == pytest.approx(2600)
+    assert client.get("/api/gold-price?weight=1000&unit=tola").status_code == 200
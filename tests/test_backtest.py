@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from backtest import run_backtest, walk_forward_folds
+from features import DEFAULT_CONFIG, FeaturePipeline
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARALLEL_RUN = """
+import multiprocessing, sys
+import numpy as np
+sys.path.insert(0, {root!r})
+from backtest import run_backtest
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method({method!r})
+    closes = 1000 + np.cumsum(np.random.default_rng(0).normal(size=1500))
+    print(len(run_backtest(closes, n_folds=4, horizon=3, workers=2)))
+"""
+
+
+def synthetic_closes(n=1500):
+    return 1000 + np.cumsum(np.random.default_rng(0).normal(size=n))
+
+
+def test_folds_cover_the_end_of_the_series():
+    folds = walk_forward_folds(600, n_folds=5, test_size=100)
+    assert [(f.test_start, f.test_end) for f in folds] == [(100, 200), (200, 300), (300, 400), (400, 500), (500, 600)]
+    assert all(f.train_start == 0 and f.train_end == f.test_start for f in folds)
+
+
+def test_parallel_matches_serial():
+    closes = synthetic_closes()
+    serial = run_backtest(closes, n_folds=4, horizon=3, workers=1)
+    parallel = run_backtest(closes, n_folds=4, horizon=3, workers=2)
+    assert len(serial) == 12
+    np.testing.assert_allclose(parallel["mae"], serial["mae"])
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_shared_memory_is_released_cleanly(tmp_path, method):
+    script = tmp_path / "run.py"
+    script.write_text(PARALLEL_RUN.format(root=ROOT_DIR, method=method))
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "12"
+    assert "KeyError" not in result.stderr and "leaked" not in result.stderr, result.stderr
+
+
+def test_folds_train_on_the_shipped_features():
+    fitted = []
+
+    def make_model():
+        from sklearn.linear_model import LinearRegression
+        model = LinearRegression()
+        fitted.append(model)
+        return model
+
+    run_backtest(synthetic_closes(), n_folds=2, horizon=3, workers=1, make_model=make_model)
+    assert len(fitted) == 2
+    assert all(model.n_features_in_ == len(FeaturePipeline.from_config(DEFAULT_CONFIG).names) for model in fitted)
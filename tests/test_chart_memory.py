@@ -0,0 +1,82 @@
+"""Memory growth of the Streamlit history chart over simulated reruns.
+
+Replays a few hundred slider interactions (a mix of repeated and new date
+ranges) through ChartCache with the same draw code the apps use, and
+checks that no figures are left open, the cache stays bounded and the
+resident set size grows by at most ``MAX_GROWTH_MB``.
+"""
+import gc
+import os
+import resource
+from datetime import timedelta
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from chart_cache import ChartCache  # noqa: E402
+from downsample import downsample_frame  # noqa: E402
+from gold_data import build_gold_frame, filter_dates  # noqa: E402
+
+RERUNS = 300
+MAX_CHARTS = 32
+MAX_GROWTH_MB = 20
+
+
+def make_ranges(df):
+    """Slider positions: mostly a handful of favourite ranges, some one-offs"""
+    rng = np.random.default_rng(0)
+    end = df.index[-1].date()
+    favourites = [(end - timedelta(days=days), end) for days in (30, 365, 1825, 5000)]
+    ranges = []
+    for _ in range(RERUNS):
+        if rng.random() < 0.8:
+            ranges.append(favourites[rng.integers(len(favourites))])
+        else:
+            ranges.append((end - timedelta(days=int(rng.integers(30, 5000))), end))
+    return ranges
+
+
+def draw(df, date_range, ax):
+    plot_df = downsample_frame(filter_dates(df, *date_range), "8g_Gold_INR")
+    ax.plot(plot_df.index, plot_df["8g_Gold_INR"], color="#FFD700", linewidth=2.5)
+    ax.grid(True, alpha=0.3)
+
+
+def rerun(cache, df, ranges):
+    for date_range in ranges:
+        cache.get_or_render(("v1", date_range, "history"), lambda ax: draw(df, date_range, ax))
+
+
+def rss_mb():
+    """Current resident set size, falling back to the peak where /proc is missing"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def test_chart_reruns_do_not_grow_memory():
+    index = pd.bdate_range("2000-01-01", periods=6500, name="Date")
+    close = 1000 + np.cumsum(np.random.default_rng(1).normal(size=len(index)))
+    df = build_gold_frame(close, index)
+    ranges = make_ranges(df)
+
+    # Warm up matplotlib's fonts and caches so they don't count as growth
+    rerun(ChartCache(max_entries=MAX_CHARTS), df, ranges[:5])
+
+    cache = ChartCache(max_entries=MAX_CHARTS)
+    gc.collect()
+    start = rss_mb()
+    rerun(cache, df, ranges)
+    gc.collect()
+    growth = rss_mb() - start
+
+    assert not plt.get_fignums()
+    assert len(cache) <= MAX_CHARTS
+    assert cache.hits + cache.misses == RERUNS and cache.hits > RERUNS // 2
+    assert growth <= MAX_GROWTH_MB, f"{growth:.1f} MB retained"
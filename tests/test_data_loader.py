@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import backfill_data, fetch_data, find_gaps, gap_runs, update_data
+from price_store import HEADER_SIZE, RECORD_DTYPE, open_store, read_header, write_store
+
+
+class FakeDownloader:
+    """Local stand-in for Yahoo Finance serving business-day closes from a frame"""
+
+    def __init__(self, days=30, end="2024-03-29"):
+        dates = pd.bdate_range(end=end, periods=days, name="Date")
+        self.data = pd.DataFrame({"Close": np.linspace(2000, 2100, days)}, index=dates)
+        self.calls = []
+
+    def __call__(self, start=None, end=None):
+        self.calls.append((start, end))
+        data = self.data
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        if end is not None:
+            data = data[data.index < pd.Timestamp(end)]
+        return data
+
+
+def stored(path):
+    records = open_store(path)
+    return records["date"].copy(), records["close"].copy()
+
+
+def test_update_appends_new_days(tmp_path):
+    path = str(tmp_path / "gold.bin")
+    source = FakeDownloader()
+    write_store(source.data.index[:-3], source.data["Close"].iloc[:-3], path)
+
+    assert update_data(source, path, str(tmp_path / "missing.csv")) == 3
+
+    dates, closes = stored(path)
+    assert len(dates) == 30
+    assert dates[-1] == np.datetime64("2024-03-29")
+    np.testing.assert_allclose(closes, source.data["Close"])
+    # The overlap window is re-fetched, not the whole history
+    assert pd.Timestamp(source.calls[0][0]) > source.data.index[0]
+
+
+def test_revised_overlap_bar_rewrites_store(tmp_path):
+    path = str(tmp_path / "gold.bin")
+    source = FakeDownloader()
+    write_store(source.data.index[:-1], source.data["Close"].iloc[:-1], path)
+    source.data.iloc[-3, 0] = 2500.0
+
+    assert update_data(source, path, str(tmp_path / "missing.csv")) == 2
+
+    dates, closes = stored(path)
+    assert len(dates) == 30
+    assert closes[-3] == 2500.0
+    assert read_header(path).last_date == np.datetime64("2024-03-29")
+
+
+def test_backfill_fills_missing_business_days(tmp_path):
+    path = str(tmp_path / "gold.bin")
+    source = FakeDownloader()
+    kept = np.ones(30, dtype=bool)
+    kept[[10, 11, 20]] = False
+    write_store(source.data.index[kept], source.data["Close"][kept], path)
+
+    gaps = find_gaps(open_store(path)["date"])
+    assert list(gaps) == list(source.data.index[~kept])
+
+    assert backfill_data(source, path, lookback_days=None) == 3
+    # One download per run of consecutive missing days, not the whole span
+    assert source.calls == [("2024-03-04", "2024-03-06"), ("2024-03-18", "2024-03-19")]
+    dates, closes = stored(path)
+    assert len(dates) == 30
+    np.testing.assert_allclose(closes, source.data["Close"])
+    assert len(find_gaps(dates)) == 0
+
+
+def test_append_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "gold.bin")
+    source = FakeDownloader()
+    fetch_data(lambda start=None: source.data.iloc[:-2], path)
+
+    # A crash after writing records but before the header leaves a torn tail
+    with open(path, "ab") as f:
+        f.write(b"\xff" * (RECORD_DTYPE.itemsize + 5))
+    assert len(open_store(path)) == 28
+
+    assert update_data(source, path, str(tmp_path / "missing.csv")) == 2
+
+    dates, closes = stored(path)
+    assert len(dates) == 30
+    np.testing.assert_allclose(closes, source.data["Close"])
+    assert (tmp_path / "gold.bin").stat().st_size == HEADER_SIZE + 30 * RECORD_DTYPE.itemsize
+
+
+def test_gap_runs_split_on_business_days():
+    gaps = np.array(["2024-03-01", "2024-03-04", "2024-03-05", "2024-03-07"], dtype="datetime64[D]")
+    assert [list(run.astype(str)) for run in gap_runs(gaps)] == [["2024-03-01", "2024-03-04", "2024-03-05"],
+                                                                 ["2024-03-07"]]
+
+
+def test_backfill_skips_gaps_older_than_lookback(tmp_path):
+    path = str(tmp_path / "gold.bin")
+    source = FakeDownloader(days=300)
+    kept = np.ones(300, dtype=bool)
+    kept[[5, 290]] = False
+    write_store(source.data.index[kept], source.data["Close"][kept], path)
+
+    assert backfill_data(source, path, lookback_days=30) == 1
+    assert source.calls == [(str(source.data.index[290].date()), str((source.data.index[290] + pd.Timedelta(days=1)).date()))]
+    assert list(find_gaps(open_store(path)["date"])) == [source.data.index[5]]
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from downsample import lttb_indices
+
+
+def test_keeps_endpoints_and_order():
+    y = np.random.default_rng(0).normal(size=10_000).cumsum()
+    keep = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert (np.diff(keep) > 0).all()
+
+
+@pytest.mark.parametrize("low, high", [(500, 501), (501, 500), (982, 983), (1, 2)])
+def test_keeps_both_extremes_in_one_bucket(low, high):
+    y = np.zeros(1000)
+    y[low], y[high] = -10, 10
+    keep = lttb_indices(np.arange(len(y)), y, 50)
+    assert len(keep) == 50
+    assert low in keep and high in keep
+    assert (np.diff(keep) > 0).all()
+
+
+def test_short_series_is_kept():
+    assert list(lttb_indices([0, 1, 2], [1, 2, 3], 10)) == [0, 1, 2]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from features import DEFAULT_CONFIG, FeaturePipeline, RollingFeatures
+from forecast import forecast_intervals, forecast_paths, training_residuals
+from model_registry import LinearParams
+
+
+def synthetic_series(n=600, seed=0):
+    dates = pd.bdate_range(end="2024-12-31", periods=n)
+    closes = 1800 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return closes, dates
+
+
+def feature_model(closes, dates, config=DEFAULT_CONFIG):
+    """Least-squares fit on the pipeline's features, as LinearParams"""
+    pipeline = FeaturePipeline.from_config(config)
+    X, y = pipeline.training_set(closes, dates)
+    beta = np.linalg.lstsq(np.column_stack([X, np.ones(len(X))]), y, rcond=None)[0]
+    return LinearParams(beta[:-1], beta[-1], {"feature_config": config})
+
+
+def test_per_path_histories_match_single_forecasts():
+    closes, dates = synthetic_series()
+    model = feature_model(closes, dates)
+    window = FeaturePipeline.from_config(DEFAULT_CONFIG).window
+    origins = np.array([100, 250, 251, 599])
+
+    history = closes[origins[:, None] + np.arange(1 - window, 0)]
+    batch = forecast_paths(model, closes[origins], 7, history, dates[origins])
+
+    for row, origin in zip(batch, origins):
+        single = forecast_paths(model, closes[origin], 7, closes[:origin], dates[origin])[0]
+        np.testing.assert_allclose(row, single)
+
+
+def test_steps_skip_weekends():
+    closes, dates = synthetic_series()
+    model = feature_model(closes, dates)
+    friday = forecast_paths(model, closes[-1], 3, closes[:-1], pd.Timestamp("2024-12-27"))
+    saturday = forecast_paths(model, closes[-1], 3, closes[:-1], pd.Timestamp("2024-12-28"))
+    monday = forecast_paths(model, closes[-1], 3, closes[:-1], pd.Timestamp("2024-12-30"))
+    np.testing.assert_allclose(saturday, monday)
+    assert not np.allclose(friday, monday)
+
+
+def test_rolling_features_match_transform_windows():
+    closes, dates = synthetic_series()
+    pipeline = FeaturePipeline.from_config(DEFAULT_CONFIG)
+    width = pipeline.window
+    starts = np.array([30, 200, 400])
+    windows = closes[starts[:, None] + np.arange(width)]
+    features = RollingFeatures(pipeline, windows, 10)
+
+    for k in range(10):
+        newest = starts + width - 1 + k
+        day = dates[newest]
+        expected = pipeline.transform_windows(closes[newest[:, None] - width + 1 + np.arange(width)], day)
+        np.testing.assert_allclose(features.features(day), expected, rtol=1e-9)
+        features.push(closes[newest + 1])
+
+
+def test_simulated_bands_are_ordered_around_the_forecast():
+    closes, dates = synthetic_series()
+    model = feature_model(closes, dates)
+    residuals = training_residuals(model, closes, dates)
+    bands = forecast_intervals(model, closes[-1], 10, residuals, history=closes[:-1], start_date=dates[-1])
+    point = forecast_paths(model, closes[-1], 10, closes[:-1], dates[-1])[0]
+
+    assert bands.shape == (3, 10)
+    assert (bands[0] < bands[1]).all() and (bands[1] < bands[2]).all()
+    np.testing.assert_allclose(bands[1], point, rtol=0.01)
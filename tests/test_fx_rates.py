@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fx_rates import FALLBACK_RATES, asof_rates, download_fx, fx_path, latest_rate, load_fx
+
+# Wednesday 2024-03-27 to Tuesday 2024-04-02: a NaN, and bad rates on Good Friday and Easter Monday
+RATES = pd.DataFrame({"Close": [83.0, np.nan, 83.4, -1.0, 0.0, 83.6]},
+                     index=pd.DatetimeIndex(["2024-03-27", "2024-03-27", "2024-03-28", "2024-03-29", "2024-04-01",
+                                             "2024-04-02"], name="Date"))
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Download RATES into a store under ``tmp_path``; returns the stored frame"""
+    calls = []
+
+    def fake_source(currency):
+        calls.append(currency)
+        return RATES
+
+    written = download_fx("inr", source=fake_source, directory=str(tmp_path))
+    assert calls == ["INR"] and written == 3
+    return load_fx("INR", str(tmp_path))
+
+
+def test_download_drops_invalid_rates(source, tmp_path):
+    assert source.index.strftime("%Y-%m-%d").tolist() == ["2024-03-27", "2024-03-28", "2024-04-02"]
+    assert source["Close"].tolist() == [83.0, 83.4, 83.6]
+    assert fx_path("INR", str(tmp_path)).endswith("fx_usd_inr.bin")
+
+
+def test_asof_carries_rates_over_weekends_and_holidays(source):
+    dates = ["2024-03-28", "2024-03-29", "2024-03-30", "2024-03-31", "2024-04-01", "2024-04-02", "2024-04-10"]
+    np.testing.assert_array_equal(asof_rates(source, dates, "INR"), [83.4, 83.4, 83.4, 83.4, 83.4, 83.6, 83.6])
+
+
+def test_dates_before_the_first_rate_use_it(source):
+    np.testing.assert_array_equal(asof_rates(source, ["2020-01-01", "2024-03-26", "2024-03-27"], "INR"),
+                                  [83.0, 83.0, 83.0])
+
+
+@pytest.mark.parametrize("fx", [None, pd.DataFrame({"Close": []}, index=pd.DatetimeIndex([], name="Date"))])
+def test_missing_history_falls_back(fx):
+    np.testing.assert_array_equal(asof_rates(fx, ["2024-03-28", "2024-04-02"], "INR"), [FALLBACK_RATES["INR"]] * 2)
+    assert latest_rate(fx, "eur") == FALLBACK_RATES["EUR"]
+
+
+def test_usd_and_unknown_currencies(source, tmp_path):
+    assert load_fx("USD", str(tmp_path)) is None and load_fx("AED", str(tmp_path)) is None
+    np.testing.assert_array_equal(asof_rates(source, ["2024-03-28"], "usd"), [1.0])
+    assert latest_rate(source, "INR") == 83.6
+    with pytest.raises(ValueError):
+        asof_rates(source, ["2024-03-28"], "GBP")
@@ -0,0 +1,13 @@
+from benchmarks.check_import_time import IMPORT_BUDGET_MS, LAZY_MODULES, best_import_times, serve_from_snapshot
+
+
+def test_api_import_fits_budget():
+    times = best_import_times()
+    assert times["index"] <= IMPORT_BUDGET_MS, f"import index took {times['index']:.1f} ms"
+    assert [name for name in LAZY_MODULES if name in times] == []
+
+
+def test_snapshot_is_served_without_pandas():
+    served = serve_from_snapshot()
+    assert served.returncode == 0, served.stderr
+    assert served.stdout.strip() == ""
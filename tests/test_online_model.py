@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+import online_model
+from features import DEFAULT_CONFIG, FeaturePipeline
+from online_model import OnlineLinearModel
+
+
+def synthetic_series(n=400, seed=0):
+    dates = pd.bdate_range(end="2024-12-31", periods=n).to_numpy(dtype="datetime64[D]")
+    closes = 1800 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return closes, dates
+
+
+def design(closes, dates):
+    X, y = FeaturePipeline.from_config(DEFAULT_CONFIG).training_set(closes, dates)
+    return np.column_stack([X, np.ones(len(X))]), y
+
+
+def weighted_fit(closes, dates, forgetting=1.0):
+    """Fitted values of a least-squares fit weighted by ``forgetting ** age``"""
+    X, y = design(closes, dates)
+    sqrt_w = np.sqrt(forgetting ** np.arange(len(y) - 1, -1, -1))
+    return X @ np.linalg.lstsq(X * sqrt_w[:, None], y * sqrt_w, rcond=None)[0]
+
+
+def fitted(model, closes, dates):
+    # The price-level features make the coefficients ill-conditioned, so compare predictions
+    params = model.solve()
+    return design(closes, dates)[0] @ np.append(params.coef_, params.intercept_)
+
+
+def coefficients(model):
+    params = model.solve()
+    return np.append(params.coef_, params.intercept_)
+
+
+def test_chunked_updates_match_one_batch_and_least_squares():
+    closes, dates = synthetic_series()
+    batch = OnlineLinearModel()
+    batch.update(closes, dates)
+
+    chunked = OnlineLinearModel()
+    added = sum(chunked.update(closes[lo:hi], dates[lo:hi]) for lo, hi in [(0, 100), (100, 101), (101, 400)])
+
+    assert added == batch.rows == len(closes) - FeaturePipeline.from_config(DEFAULT_CONFIG).window
+    np.testing.assert_allclose(chunked.xtx, batch.xtx, rtol=1e-9)
+    np.testing.assert_allclose(chunked.xty, batch.xty, rtol=1e-9)
+    np.testing.assert_allclose(fitted(chunked, closes, dates), fitted(batch, closes, dates), rtol=1e-6)
+    np.testing.assert_allclose(fitted(batch, closes, dates), weighted_fit(closes, dates), rtol=1e-6)
+
+
+def test_forgetting_matches_age_weighted_fit():
+    closes, dates = synthetic_series()
+    model = OnlineLinearModel(forgetting=0.99)
+    model.update(closes[:250], dates[:250])
+    model.update(closes[250:], dates[250:])
+    np.testing.assert_allclose(fitted(model, closes, dates), weighted_fit(closes, dates, 0.99), rtol=1e-6)
+
+
+def test_already_seen_days_are_ignored():
+    closes, dates = synthetic_series()
+    model = OnlineLinearModel()
+    model.update(closes[:300], dates[:300])
+    assert model.update(closes[:300], dates[:300]) == 0
+    assert model.update(closes, dates) == 100
+
+
+def test_save_load_round_trip(tmp_path):
+    closes, dates = synthetic_series()
+    model = OnlineLinearModel(forgetting=0.995)
+    model.update(closes[:300], dates[:300])
+    path = str(tmp_path / "state.npz")
+    model.save(path)
+
+    loaded = OnlineLinearModel.load(path)
+    assert loaded.rows == model.rows and loaded.forgetting == 0.995 and loaded.last_date == model.last_date
+    np.testing.assert_array_equal(coefficients(loaded), coefficients(model))
+
+    model.update(closes[300:], dates[300:])
+    loaded.update(closes[300:], dates[300:])
+    np.testing.assert_allclose(loaded.xtx, model.xtx)
+    np.testing.assert_allclose(fitted(loaded, closes, dates), fitted(model, closes, dates))
+
+
+def test_update_model_reads_only_new_days(tmp_path, monkeypatch):
+    closes, dates = synthetic_series()
+    frame = pd.DataFrame({"Close": closes}, index=pd.DatetimeIndex(dates, name="Date"))
+    paths = {"state_path": str(tmp_path / "state.npz"), "model_path": str(tmp_path / "model.pkl"),
+             "params_path": str(tmp_path / "model.json")}
+
+    monkeypatch.setattr(online_model, "load_prices", lambda: frame.iloc[:300])
+    online_model.update_model(**paths)
+
+    seen = []
+    update = OnlineLinearModel.update
+
+    def recording_update(self, closes, dates):
+        seen.append(np.asarray(dates, dtype="datetime64[D]"))
+        return update(self, closes, dates)
+
+    monkeypatch.setattr(OnlineLinearModel, "update", recording_update)
+    monkeypatch.setattr(online_model, "load_prices", lambda: frame)
+    assert online_model.update_model(**paths) == 100
+    assert len(seen) == 1 and len(seen[0]) == 100 and seen[0][0] == dates[300]
+
+    full = OnlineLinearModel()
+    full.update(closes, dates)
+    saved = OnlineLinearModel.load(paths["state_path"])
+    np.testing.assert_allclose(saved.xtx, full.xtx, rtol=1e-9)
+    np.testing.assert_allclose(fitted(saved, closes, dates), fitted(full, closes, dates), rtol=1e-6)
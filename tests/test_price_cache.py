@@ -0,0 +1,155 @@
+import threading
+
+import pandas as pd
+
+from price_cache import PriceCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSource:
+    """Local stand-in for Yahoo Finance: full history, then whatever ``new`` holds"""
+
+    def __init__(self, days=10):
+        dates = pd.date_range("2024-01-01", periods=days, name="Date")
+        self.history = pd.DataFrame({"Close": [2000.0 + i for i in range(days)]}, index=dates)
+        self.new = None
+        self.calls = []
+
+    def __call__(self, start=None):
+        self.calls.append(start)
+        if start is None:
+            return self.history
+        return self.new
+
+
+def test_cached_until_ttl_expires():
+    source, clock = FakeSource(), FakeClock()
+    cache = PriceCache(source, ttl=60, clock=clock)
+
+    first = cache.get()
+    clock.now = 59
+    assert cache.get() is first
+    assert source.calls == [None]
+
+    clock.now = 60
+    cache.get()
+    assert len(source.calls) == 2
+
+
+def test_refresh_appends_rows_after_last_cached_date():
+    source, clock = FakeSource(), FakeClock()
+    cache = PriceCache(source, ttl=60, clock=clock)
+    cache.get()
+
+    # The overlapping first row must not be duplicated
+    source.new = pd.DataFrame({"Close": [2009.5, 2010.0]},
+                              index=pd.to_datetime(["2024-01-10", "2024-01-11"]))
+    clock.now = 60
+    data = cache.get()
+
+    assert source.calls[-1] == "2024-01-11"
+    assert len(data) == 11
+    assert data.index[-1] == pd.Timestamp("2024-01-11")
+    assert data["Close"].iloc[-2] == 2009.0
+
+
+def test_failed_refresh_keeps_cached_frame():
+    source, clock = FakeSource(), FakeClock()
+    cache = PriceCache(source, ttl=60, clock=clock)
+    first = cache.get()
+
+    clock.now = 60
+    assert cache.get() is first
+    clock.now = 90
+    assert cache.get() is first
+    assert len(source.calls) == 2
+
+
+def test_readers_get_cached_frame_during_refresh():
+    source, clock = FakeSource(), FakeClock()
+    cache = PriceCache(source, ttl=60, clock=clock)
+    first = cache.get()
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(start=None):
+        started.set()
+        release.wait(5)
+        return pd.DataFrame({"Close": [2010.0]}, index=pd.to_datetime(["2024-01-11"]))
+
+    cache.fetcher = slow_fetch
+    clock.now = 60
+    refresher = threading.Thread(target=cache.get)
+    refresher.start()
+    assert started.wait(5)
+
+    # Other readers neither wait nor start a second download
+    readers = [cache.get() for _ in range(5)]
+    assert all(data is first for data in readers)
+
+    release.set()
+    refresher.join(5)
+    assert len(cache.get()) == 11
+
+
+def test_background_refresh_serves_stale_frame():
+    source, clock = FakeSource(), FakeClock()
+    cache = PriceCache(source, ttl=60, clock=clock, background=True, timeout=5)
+    first = cache.get()
+
+    release = threading.Event()
+
+    def slow_fetch(start=None):
+        release.wait(5)
+        return pd.DataFrame({"Close": [2010.0]}, index=pd.to_datetime(["2024-01-11"]))
+
+    cache.fetcher = slow_fetch
+    clock.now = 60
+    assert cache.get() is first
+
+    release.set()
+    cache._refresh_thread.join(5)
+    assert len(cache.get()) == 11
+
+
+def failing_source(calls):
+    def fetch(start=None):
+        calls.append(start)
+        return None
+    return fetch
+
+
+def test_failed_first_download_backs_off():
+    calls, clock = [], FakeClock()
+    cache = PriceCache(failing_source(calls), ttl=900, clock=clock, retry=30)
+
+    assert all(cache.get() is None for _ in range(50))
+    assert len(calls) == 1
+
+    clock.now = 30
+    assert cache.get() is None
+    assert len(calls) == 2
+
+
+def test_failed_background_download_backs_off():
+    calls, clock = [], FakeClock()
+    cache = PriceCache(failing_source(calls), ttl=900, clock=clock, background=True, timeout=5, retry=30)
+
+    cache.get(wait=False)
+    cache._refresh_thread.join(5)
+    for _ in range(50):
+        assert cache.get(wait=False) is None
+    assert len(calls) == 1
+    assert cache._refresh_thread.is_alive() is False
+
+    clock.now = 30
+    cache.get(wait=False)
+    cache._refresh_thread.join(5)
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+import numpy as np
+
+import gold_data
+from price_stats import StatsIndex
+from price_store import write_store
+
+
+def test_queries_match_numpy():
+    values = np.random.default_rng(0).normal(2000, 50, 1000)
+    stats = StatsIndex(values)
+    for start, stop in [(0, 1000), (10, 11), (3, 700), (999, 1000), (250, 513)]:
+        window = values[start:stop]
+        assert np.isclose(stats.mean(slice(start, stop)), window.mean())
+        assert stats.min(slice(start, stop)) == window.min()
+        assert stats.max(slice(start, stop)) == window.max()
+
+
+def test_sync_extends_into_a_new_index():
+    values = np.random.default_rng(1).normal(2000, 50, 300)
+    old = StatsIndex(values[:200])
+    new = old.sync(values)
+
+    assert new is not old
+    assert len(old) == 200 and len(new) == 300
+    assert old.max() == values[:200].max()
+    assert new.max() == values.max() and new.min(slice(150, 260)) == values[150:260].min()
+    assert old.sync(values[:200]) is old
+
+
+def test_sync_rebuilds_on_revised_row():
+    values = np.full(50, 100.0)
+    stats = StatsIndex(values)
+    revised = np.append(values, 100.0)
+    revised[47] = 500.0
+
+    synced = stats.sync(revised)
+    assert synced.max() == 500.0
+    assert np.isclose(synced.mean(), revised.mean())
+    assert stats.max() == 100.0
+
+
+def test_stats_index_picks_up_revised_bars(tmp_path):
+    path, csv_path = str(tmp_path / "gold.bin"), str(tmp_path / "missing.csv")
+    dates = np.arange("2024-01-01", 51, dtype="datetime64[D]")
+    closes = np.full(51, 100.0)
+
+    write_store(dates[:50], closes[:50], path)
+    assert gold_data.get_stats_index("Close", path, csv_path).max() == 100.0
+
+    # The upstream revised bar 47 and added a day: the store is rewritten
+    closes[47] = 500.0
+    write_store(dates, closes, path)
+    assert gold_data.get_gold_data(path, csv_path)["Close"].max() == 500.0
+    stats = gold_data.get_stats_index("Close", path, csv_path)
+    assert stats.max() == 500.0
+    assert np.isclose(stats.mean(), closes.mean())
@@ -1,47 +1,24 @@
-import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 import pickle
 import os
 
-def train_model():
+from features import DEFAULT_CONFIG, FeaturePipeline
+from model_registry import MODEL_PATH, PARAMS_PATH, export_params
+from price_store import load_prices
+
+def train_model(feature_config=None):
     """Train and save a linear regression model for gold price prediction"""
     print("Training gold price prediction model...")
+    pipeline = FeaturePipeline.from_config(feature_config or DEFAULT_CONFIG)
     
     # Load data
-    df = pd.read_csv("data/gold_data.csv")
-    
-    # Fix the data format issues
-    print(f"Columns in dataset: {df.columns.tolist()}")
-    
-    # Handle the unusual CSV format
-    if "Price" in df.columns and "Close" in df.columns:
-        # Use the Close column directly
-        df = df[["Close"]].copy()
-    elif "Date" in df.columns and "Close" in df.columns:
-        # Standard format
-        df = df.set_index("Date")
-    else:
-        # Try to fix the unusual format
-        # Skip the first few rows which might contain header info
-        df = pd.read_csv("data/gold_data.csv", skiprows=3)
-        print(f"After skipping rows, columns: {df.columns.tolist()}")
-        
-        if "Close" not in df.columns and len(df.columns) >= 2:
-            # Rename columns if needed
-            df.columns = ["Date", "Close"]
-    
-    # Ensure we have the Close column
-    if "Close" not in df.columns:
-        raise ValueError(f"Close column not found in data. Available columns: {df.columns.tolist()}")
+    df = load_prices()
+    print(f"Loaded {len(df)} records")
     
-    # Create target variable (next day's price)
-    df["Target"] = df["Close"].shift(-1)
-    df.dropna(inplace=True)
-    
-    # Prepare features and target
-    X = df[["Close"]].values
-    y = df["Target"].values
+    # Build lag/return/rolling/calendar features; the target is the next day's close
+    X, y = pipeline.training_set(df["Close"].to_numpy(), df.index)
+    print(f"Features: {', '.join(pipeline.names)}")
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
@@ -50,18 +27,31 @@ def train_model():
     model = LinearRegression()
     model.fit(X_train, y_train)
     
+    # Forecasting rebuilds the same features from this config
+    model.feature_config_ = pipeline.to_config()
+    
     # Create model directory if it doesn't exist
     os.makedirs("model", exist_ok=True)
     
     # Save model
-    with open("model/model.pkl", "wb") as f:
+    with open(MODEL_PATH, "wb") as f:
         pickle.dump(model, f)
     
-    print("Model trained and saved to model/model.pkl")
+    print(f"Model trained and saved to {MODEL_PATH}")
     
     # Calculate accuracy
     score = model.score(X_test, y_test)
     print(f"Model R² score: {score:.4f}")
+    
+    # Export the coefficients so inference can skip unpickling and sklearn
+    export_params(model, PARAMS_PATH, MODEL_PATH, metadata={
+        "features": pipeline.names,
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "last_date": str(df.index.max().date()),
+        "r2": score,
+    })
+    print(f"Model parameters saved to {PARAMS_PATH}")
 
 if __name__ == "__main__":
     train_model()
\ No newline at end of file